@@ -0,0 +1,336 @@
+"""End-to-end benchmark of the frame -> device send pipeline.
+
+Runs the Screens, Themes, Banner and Designer send paths against the bundled
+mock device and records per-stage latency (read, decode, resize, JPEG,
+base64, payload build, HTTP POST), frames/sec and bytes on the wire.
+
+    python benchmarks/send_pipeline.py --out bench.json
+    python benchmarks/send_pipeline.py --baseline bench-0.3.1.json
+
+Use ``--baseline`` to compare against an earlier run's JSON.
+"""
+
+import argparse
+import base64
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+from divoom_gaming_gate.mock_device import MockDevice
+from divoom_gaming_gate.utils.device import Command, DivoomClient, next_pic_id
+from divoom_gaming_gate.utils.encoding import encode_jpeg, encode_to_budget
+from divoom_gaming_gate.utils.image import normalize_frame
+from divoom_gaming_gate.utils.blob_store import BlobStore
+from divoom_gaming_gate.themes.theme_file import read_theme, write_theme, encode_screen
+
+IMG_SIZE = 128
+STAGES = ["read", "decode", "resize", "jpeg", "base64", "payload", "post"]
+
+
+# --- synthetic inputs -------------------------------------------------------
+
+def _scene(size, t):
+    """A busy-ish test frame: gradient background with moving shapes."""
+    w, h = size
+    img = Image.linear_gradient("L").resize((w, h)).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for i in range(12):
+        x = int((w / 12) * i + 40 * math.sin(t / 5.0 + i))
+        y = int(h / 2 + (h / 3) * math.cos(t / 7.0 + i))
+        r = 10 + 4 * (i % 5)
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=((37 * i) % 256, (91 * t) % 256, (53 * i + t) % 256))
+    draw.text((10, 10), f"frame {t}", fill=(255, 255, 255))
+    return img
+
+
+def _gif_bytes(frames, duration=100):
+    buf = io.BytesIO()
+    frames[0].save(buf, format="GIF", save_all=True, append_images=frames[1:], duration=duration, loop=0)
+    return buf.getvalue()
+
+
+def _png_bytes(img):
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def make_inputs():
+    small_png = _png_bytes(_scene((200, 200), 0))
+    gif_480p = _gif_bytes([_scene((854, 480), t) for t in range(60)])
+    theme_screens = []
+    theme_frames = []
+    for s in range(5):
+        frames = [_scene((IMG_SIZE, IMG_SIZE), t + s * 10) for t in range(12 if s % 2 else 1)]
+        theme_frames.append(frames)
+        if len(frames) > 1:
+            theme_screens.append({"type": "gif", "data": base64.b64encode(_gif_bytes(frames)).decode()})
+        else:
+            theme_screens.append({"type": "png", "data": base64.b64encode(_png_bytes(frames[0])).decode()})
+    banner = _scene((1280, 256), 3)
+    designer = ["data:image/png;base64," + base64.b64encode(_png_bytes(_scene((512, 512), t))).decode()
+                for t in range(20)]
+    return {
+        "small_png": small_png,
+        "gif_480p": gif_480p,
+        "theme": {"name": "bench", "screens": theme_screens},
+        "theme_frames": theme_frames,
+        "banner": banner,
+        "designer": designer,
+    }
+
+
+# --- measurement ------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.bytes = 0
+        self.frames = 0
+
+    def time(self, stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.samples[stage].append(time.perf_counter() - start)
+        return result
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(math.ceil(pct / 100.0 * len(ordered))) - 1))
+    return ordered[k]
+
+
+def make_theme_file(directory, screen_frames, quality):
+    """Save ``screen_frames`` the way Save as Theme does, into a throwaway
+    blob store under ``directory``. Returns ``(path, store)``."""
+    store = BlobStore(os.path.join(directory, "blobs"))
+    budget = {"frame_bytes": int(quality[:-1])} if isinstance(quality, str) else {}
+    screens = [(encode_screen(frames, quality=85 if budget else quality, **budget), 100, quality)
+               for frames in screen_frames]
+    path = os.path.join(directory, "bench.theme")
+    write_theme(path, "bench", screens, store=store)
+    return path, store
+
+
+def send_jpegs(rec, client, jpegs, lcd_array, speed=100):
+    """Tail of the send path for frames that are already JPEG."""
+    pic_id = next_pic_id()
+    for offset, jpeg in enumerate(jpegs):
+        b64 = rec.time("base64", lambda: base64.b64encode(jpeg).decode())
+        body = rec.time("payload", lambda: json.dumps(Command.send_http_gif(
+            lcd_array, len(jpegs), offset, pic_id, speed, b64, IMG_SIZE)).encode())
+        resp = rec.time("post", client.session.post, client.url, data=body,
+                        headers={"Content-Type": "application/json"}, timeout=client.timeout)
+        resp.raise_for_status()
+        rec.bytes += len(body)
+        rec.frames += 1
+
+
+def send_frames(rec, client, frames, lcd_array, quality, speed=100):
+    """The shared tail of every send path: JPEG -> base64 -> payload -> POST.
+
+    A string ``quality`` such as ``"4096B"`` means a per-frame byte budget.
+    """
+    pic_id = next_pic_id()
+    for offset, frame in enumerate(frames):
+        if isinstance(quality, str):
+            jpeg = rec.time("jpeg", lambda: encode_to_budget(frame, int(quality[:-1]))[0])
+        else:
+            jpeg = rec.time("jpeg", encode_jpeg, frame, quality)
+        b64 = rec.time("base64", lambda: base64.b64encode(jpeg).decode())
+        body = rec.time("payload", lambda: json.dumps(Command.send_http_gif(
+            lcd_array, len(frames), offset, pic_id, speed, b64, IMG_SIZE)).encode())
+        resp = rec.time("post", client.session.post, client.url, data=body,
+                        headers={"Content-Type": "application/json"}, timeout=client.timeout)
+        resp.raise_for_status()
+        rec.bytes += len(body)
+        rec.frames += 1
+
+
+def _decode_all(data):
+    img = Image.open(io.BytesIO(data))
+    frames = []
+    for i in range(getattr(img, "n_frames", 1)):
+        img.seek(i)
+        frames.append(img.convert("RGB"))
+    return frames
+
+
+def path_screens(rec, client, data, quality, mode="Fit", skip=1):
+    raw = rec.time("decode", _decode_all, data)
+    frames = [rec.time("resize", normalize_frame, fr, mode) for fr in raw][::skip]
+    send_frames(rec, client, frames, [1, 0, 0, 0, 0], quality)
+
+
+def path_themes(rec, client, theme_file):
+    """Themes path as the app sends it: stored JPEGs read back and posted."""
+    path, store = theme_file
+    theme = rec.time("read", read_theme, path, store)
+    for index, screen in enumerate(theme.screens):
+        jpegs = rec.time("read", screen.jpeg_frames)
+        lcd = [0] * 5
+        lcd[index] = 1
+        send_jpegs(rec, client, jpegs, lcd, screen.speed)
+
+
+def path_themes_legacy(rec, client, theme, quality):
+    """Legacy JSON themes, which are still decoded and encoded on send."""
+    for index, screen in enumerate(theme["screens"]):
+        frames = rec.time("decode", _decode_all, base64.b64decode(screen["data"]))
+        lcd = [0] * 5
+        lcd[index] = 1
+        send_frames(rec, client, frames, lcd, quality)
+
+
+def path_banner(rec, client, banner, quality):
+    canvas = rec.time("resize", lambda: banner.resize((640, 128), Image.LANCZOS))
+    for i in range(5):
+        section = canvas.crop((i * IMG_SIZE, 0, (i + 1) * IMG_SIZE, IMG_SIZE))
+        lcd = [0] * 5
+        lcd[i] = 1
+        send_frames(rec, client, [section], lcd, quality)
+
+
+def path_designer(rec, client, urls, quality):
+    frames = []
+    for url in urls:
+        img = rec.time("decode", lambda: Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1]))).convert("RGB"))
+        frames.append(rec.time("resize", img.resize, (IMG_SIZE, IMG_SIZE)))
+    send_frames(rec, client, frames, [1, 1, 1, 1, 1], quality)
+
+
+def path_screens_pooled(rec, client, data, quality, mode="Fit"):
+    """Screens path through GifJob, which encodes on the shared pool while
+    earlier frames are still being posted. ``jpeg`` here is time spent
+    waiting for the next encoded frame."""
+    from divoom_gaming_gate.utils.send_queue import GifJob
+
+    raw = rec.time("decode", _decode_all, data)
+    frames = [rec.time("resize", normalize_frame, fr, mode) for fr in raw]
+    kwargs = {"frame_bytes": int(quality[:-1])} if isinstance(quality, str) else {"quality": quality}
+    job = GifJob("bench", client.ip, [1, 0, 0, 0, 0], frames=frames, force=True, **kwargs)
+    job.start_encoding()
+    job.prepare()
+    for offset in range(len(job)):
+        payload = rec.time("jpeg", job.payload, offset)
+        body = rec.time("payload", lambda: json.dumps(payload).encode())
+        resp = rec.time("post", client.session.post, client.url, data=body,
+                        headers={"Content-Type": "application/json"}, timeout=client.timeout)
+        resp.raise_for_status()
+        rec.bytes += len(body)
+        rec.frames += 1
+
+
+def run_case(name, fn, client, repeat):
+    rec = Recorder()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(rec, client)
+    wall = time.perf_counter() - start
+    stages = {}
+    for stage in STAGES:
+        values = rec.samples.get(stage, [])
+        if values:
+            stages[stage] = {
+                "count": len(values),
+                "total_ms": round(sum(values) * 1000, 3),
+                "p50_ms": round(_percentile(values, 50) * 1000, 3),
+                "p95_ms": round(_percentile(values, 95) * 1000, 3),
+            }
+    return {
+        "frames": rec.frames,
+        "wall_s": round(wall, 4),
+        "frames_per_sec": round(rec.frames / wall, 2) if wall else 0.0,
+        "bytes_on_wire": rec.bytes,
+        "bytes_per_frame": rec.bytes // rec.frames if rec.frames else 0,
+        "stages": stages,
+    }
+
+
+def print_report(results, baseline=None):
+    for name, res in results.items():
+        line = f"{name:<22} {res['frames']:>4} frames  {res['frames_per_sec']:>8.1f} fps  {res['bytes_on_wire']/1024:>9.1f} KiB"
+        if baseline and name in baseline:
+            old = baseline[name]["frames_per_sec"]
+            if old:
+                line += f"  ({(res['frames_per_sec'] - old) / old * 100:+.1f}% fps vs baseline)"
+        print(line)
+        for stage, s in res["stages"].items():
+            print(f"    {stage:<8} p50 {s['p50_ms']:>8.3f} ms   p95 {s['p95_ms']:>8.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--quality", type=int, default=85)
+    parser.add_argument("--frame-kb", type=float, default=0,
+                        help="encode to a per-frame size budget instead of a fixed quality")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="mock device latency per request, in ms")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="mock device bandwidth cap in KB/s")
+    args = parser.parse_args(argv)
+
+    device = MockDevice(latency=args.latency / 1000.0, bandwidth=args.bandwidth * 1024).start()
+    client = DivoomClient(device.address)
+    inputs = make_inputs()
+    q = f"{int(args.frame_kb * 1024)}B" if args.frame_kb else args.quality
+    scratch = tempfile.TemporaryDirectory()
+    theme_file = make_theme_file(scratch.name, inputs["theme_frames"], q)
+    cases = {
+        "screens_png": lambda rec, c: path_screens(rec, c, inputs["small_png"], q),
+        "screens_gif480": lambda rec, c: path_screens(rec, c, inputs["gif_480p"], q),
+        "screens_gif480_pooled": lambda rec, c: path_screens_pooled(rec, c, inputs["gif_480p"], q),
+        "themes_5screen": lambda rec, c: path_themes(rec, c, theme_file),
+        "themes_legacy": lambda rec, c: path_themes_legacy(rec, c, inputs["theme"], q),
+        "banner": lambda rec, c: path_banner(rec, c, inputs["banner"], q),
+        "designer": lambda rec, c: path_designer(rec, c, inputs["designer"], q),
+    }
+    try:
+        results = {name: run_case(name, fn, client, args.repeat) for name, fn in cases.items()}
+    finally:
+        client.close()
+        device.stop()
+        scratch.cleanup()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f).get("results")
+    print_report(results, baseline)
+
+    if args.out:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "pillow": Image.__version__,
+                "quality": args.quality,
+                "frame_kb": args.frame_kb,
+                "repeat": args.repeat,
+                "latency_ms": args.latency,
+                "bandwidth_kbps": args.bandwidth,
+            },
+            "results": results,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
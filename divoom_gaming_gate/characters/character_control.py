@@ -1,15 +1,14 @@
 from ..utils.config import Config
-import io, base64, time, requests
 import json
 import os
-from PIL import Image, ImageDraw, ImageFont
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QLineEdit, QSpinBox, QPushButton,
     QVBoxLayout, QHBoxLayout, QFileDialog, QInputDialog, QComboBox, QSizePolicy
 )
 from PyQt5.QtGui import QPixmap, QImage, QFont
 from PyQt5.QtCore import Qt, pyqtSignal, QObject
-from ..utils.image import compose_character_image
+from .character_render import CharacterRenderer
+from ..utils.send_queue import get_send_queue, GifJob, lcd_array_for, force_requested
 import shutil
 from functools import partial
 
@@ -54,105 +53,6 @@ def load_assignments():
 def save_assignments(assignments):
     with open(ASSIGNMENTS_FILE, "w") as f:
         json.dump(assignments, f, indent=2)
-def compose_character_image(background_path, portrait_path, name, stats):
-    if background_path and os.path.exists(background_path):
-        bg = Image.open(background_path).convert("RGB").resize((128, 128))
-    else:
-        bg = Image.new("RGB", (128, 128), (0, 0, 0))
-
-    draw = ImageDraw.Draw(bg, "RGBA")
-    try:
-        font = ImageFont.truetype("arial.ttf", 14)
-    except Exception:
-        font = ImageFont.load_default()
-
-    # --- Draw name overlay at the top ---
-    name_box_height = 22
-    draw.rectangle([0, 0, 128, name_box_height], fill=(40, 40, 40, 180))
-    try:
-        bbox = draw.textbbox((0, 0), name, font=font)
-        w = bbox[2] - bbox[0]
-    except AttributeError:
-        w, _ = font.getsize(name)
-    draw.text(((128 - w) // 2, 4), name, fill=(255, 255, 255), font=font)
-
-    # --- Draw stats in two columns ---
-    stat_keys = list(stats.keys())
-    n = len(stat_keys)
-    left_stats = stat_keys[: (n + 1) // 2]
-    right_stats = stat_keys[(n + 1) // 2 :]
-
-    stat_box_top = name_box_height + 2
-    stat_box_height = max(len(left_stats), len(right_stats)) * 16 + 4
-    draw.rectangle([0, stat_box_top, 128, stat_box_top + stat_box_height], fill=(40, 40, 40, 180))
-
-    for col, stat_list in enumerate([left_stats, right_stats]):
-        for i, k in enumerate(stat_list):
-            y = stat_box_top + 2 + i * 16
-            x = 6 if col == 0 else 68  # 68 leaves a gap between columns
-            v = stats[k]
-            base = str(v.get('base', ''))
-            current = str(v.get('current', ''))
-            modifier = str(v.get('modifier', ''))
-            abbr = k  # Use stat key directly
-            try:
-                bold_font = ImageFont.truetype("arialbd.ttf", 14)
-            except Exception:
-                bold_font = font
-            draw.text((x, y), f"{abbr}: ", fill=(200, 200, 200), font=font)
-            x_offset = x + draw.textlength(f"{abbr}: ", font=font)
-            draw.text((x_offset, y), base, fill=(255, 255, 255), font=bold_font)
-            x_offset += draw.textlength(base, font=bold_font)
-            # Draw current if present
-            if current:
-                try:
-                    base_val = float(base)
-                    curr_val = float(current)
-                    if curr_val < base_val:
-                        pct = curr_val / base_val if base_val else 0
-                        if pct >= 0.7:
-                            curr_color = (0, 200, 0)
-                        elif pct >= 0.3:
-                            curr_color = (220, 180, 0)
-                        else:
-                            curr_color = (220, 0, 0)
-                    else:
-                        curr_color = (0, 200, 0)
-                except Exception:
-                    curr_color = (200, 200, 200)
-                draw.text((x_offset, y), f" / {current}", fill=curr_color, font=font)
-                x_offset += draw.textlength(f" / {current}", font=font)
-            # Draw modifier if present
-            if modifier:
-                mod_color = (200, 200, 200)
-                mod_str = modifier.strip()
-                # Try to interpret as a number
-                try:
-                    mod_val = int(mod_str)
-                except ValueError:
-                    try:
-                        mod_val = float(mod_str)
-                    except ValueError:
-                        mod_val = None
-
-                if mod_val is not None:
-                    if mod_val > 0:
-                        mod_color = (0, 200, 0)
-                        mod_str = f"+{mod_val}"  # Always show plus for positive
-                    elif mod_val < 0:
-                        mod_color = (220, 0, 0)
-                        mod_str = f"{mod_val}"
-                    else:
-                        mod_color = (200, 200, 200)
-                        mod_str = f"{mod_val}"
-                else:
-                    # Not a number, fallback to string and color by prefix
-                    if mod_str.startswith('+'):
-                        mod_color = (0, 200, 0)
-                    elif mod_str.startswith('-'):
-                        mod_color = (220, 0, 0)
-                draw.text((x_offset, y), f" ({mod_str})", fill=mod_color, font=font)
-    return bg
 
 class PresetSignalEmitter(QObject):
     presets_updated = pyqtSignal()
@@ -164,6 +64,7 @@ class CharacterControl(QWidget):
     def __init__(self, slot):
         super().__init__()
         self.slot = slot
+        self.renderer = CharacterRenderer()   # keeps unchanged layers between keystrokes
         self.char = {
             "name": f"Char {slot+1}",
             "stats": {"Brawn": 1, "Agility": 1, "Intellect": 1, "Cunning": 1, "Willpower": 1, "Presence": 1},
@@ -209,6 +110,7 @@ class CharacterControl(QWidget):
         self.send_btn = QPushButton("Send")
         self.send_btn.clicked.connect(self.send)
         self.send_btn.setStyleSheet("QPushButton:hover { background: #222; }")
+        self.send_btn.setToolTip("Send to this screen (Shift+click to re-send even if unchanged)")
 
         # Background button
         self.bg_btn = QPushButton("Add Background")
@@ -458,7 +360,7 @@ class CharacterControl(QWidget):
                 stat_dict["modifier"] = modifier
             stats[name_edit.text()] = stat_dict
         name = self.name_edit.text()
-        img = compose_character_image(
+        img = self.renderer.render(
             self.char["background"], self.char["portrait"], name, stats
         )
         data = img.tobytes("raw", "RGB")
@@ -488,26 +390,14 @@ class CharacterControl(QWidget):
             stats[name_edit.text()] = stat_dict
 
         name  = self.name_edit.text()
-        img   = compose_character_image(
+        img   = self.renderer.render(
             self.char["background"], self.char["portrait"], name, stats
         )
 
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=85)
-        b64 = base64.b64encode(buf.getvalue()).decode()
-        pid = int(time.time())
-
-        payload = {
-            "Command":  "Draw/SendHttpGif",
-            "LcdArray": [1 if i==self.slot else 0 for i in range(SCREEN_COUNT)],
-            "PicNum":   1,
-            "PicOffset":0,
-            "PicID":    pid,
-            "PicSpeed": 100,
-            "PicWidth": IMG_SIZE,
-            "PicData":  b64
-        }
-        requests.post(f"http://{DEVICE_IP}/post", json=payload)
+        get_send_queue().submit(GifJob(
+            f"Character {self.slot+1}", DEVICE_IP, lcd_array_for(self.slot),
+            frames=[img], speed=100, quality=85, force=force_requested()
+        ))
 
     def load_background(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select Background Image", "", "Images (*.png *.jpg *.jpeg *.bmp *.gif)")
@@ -0,0 +1,190 @@
+# characters/character_render.py
+#
+# Character card renderer with layered caching. A card is built from:
+#
+#   base  - the background resized to 128x128 with the translucent name and
+#           stat boxes drawn on it; changes only with the background file or
+#           the number of stat rows
+#   tiles - one transparent tile per text item (the name, each stat row),
+#           keyed by its text, so a keystroke redraws only the row it touched
+#
+# Fonts are resolved once per process instead of on every draw.
+
+import os
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+IMG_SIZE      = 128
+FONT_SIZE     = 14
+REGULAR_FONTS = ("arial.ttf",)
+BOLD_FONTS    = ("arialbd.ttf", "arial.ttf")
+BOX_FILL      = (40, 40, 40, 180)
+NAME_BOX_H    = 22
+NAME_Y        = 4
+ROW_H         = 16
+TILE_H        = 20     # a little taller than a row so descenders aren't clipped
+COLUMN_X      = (6, 68)
+
+LABEL_COLOR   = (200, 200, 200)
+VALUE_COLOR   = (255, 255, 255)
+GOOD_COLOR    = (0, 200, 0)
+WARN_COLOR    = (220, 180, 0)
+BAD_COLOR     = (220, 0, 0)
+
+
+@lru_cache(maxsize=None)
+def resolve_font(names, size=FONT_SIZE):
+    for name in names:
+        try:
+            return ImageFont.truetype(name, size)
+        except Exception:
+            continue
+    return ImageFont.load_default()
+
+
+def text_width(draw, text, font):
+    try:
+        bbox = draw.textbbox((0, 0), text, font=font)
+        return bbox[2] - bbox[0]
+    except AttributeError:
+        return font.getsize(text)[0]
+
+
+def current_color(base, current):
+    try:
+        base_val = float(base)
+        curr_val = float(current)
+    except Exception:
+        return LABEL_COLOR
+    if curr_val >= base_val:
+        return GOOD_COLOR
+    pct = curr_val / base_val if base_val else 0
+    if pct >= 0.7:
+        return GOOD_COLOR
+    if pct >= 0.3:
+        return WARN_COLOR
+    return BAD_COLOR
+
+
+def format_modifier(modifier):
+    """Modifier text as shown (``+1``, ``-2``, ...) and its colour."""
+    mod_str = modifier.strip()
+    try:
+        mod_val = int(mod_str)
+    except ValueError:
+        try:
+            mod_val = float(mod_str)
+        except ValueError:
+            mod_val = None
+    if mod_val is None:
+        # Not a number, colour by prefix
+        if mod_str.startswith('+'):
+            return mod_str, GOOD_COLOR
+        if mod_str.startswith('-'):
+            return mod_str, BAD_COLOR
+        return mod_str, LABEL_COLOR
+    if mod_val > 0:
+        return f"+{mod_val}", GOOD_COLOR
+    if mod_val < 0:
+        return f"{mod_val}", BAD_COLOR
+    return f"{mod_val}", LABEL_COLOR
+
+
+def stat_row_key(label, stat):
+    return (label, str(stat.get('base', '')), str(stat.get('current', '')), str(stat.get('modifier', '')))
+
+
+class CharacterRenderer:
+    """Renders character cards for one slot, reusing whatever didn't change
+    since the previous call."""
+
+    def __init__(self):
+        self._bg_key = None
+        self._bg = None
+        self._base_key = None
+        self._base = None
+        self._name_tile = (None, None)
+        self._rows = {}
+
+    def _background(self, path):
+        try:
+            key = (path, os.stat(path).st_mtime) if path else None
+        except OSError:
+            key = None
+        if key != self._bg_key or self._bg is None:
+            if key:
+                self._bg = Image.open(path).convert("RGB").resize((IMG_SIZE, IMG_SIZE))
+            else:
+                self._bg = Image.new("RGB", (IMG_SIZE, IMG_SIZE), (0, 0, 0))
+            self._bg_key = key
+        return self._bg_key
+
+    def _base_layer(self, background_path, rows):
+        key = (self._background(background_path), rows)
+        if key != self._base_key:
+            base = self._bg.copy()
+            draw = ImageDraw.Draw(base, "RGBA")
+            draw.rectangle([0, 0, IMG_SIZE, NAME_BOX_H], fill=BOX_FILL)
+            top = NAME_BOX_H + 2
+            draw.rectangle([0, top, IMG_SIZE, top + rows * ROW_H + 4], fill=BOX_FILL)
+            self._base = base
+            self._base_key = key
+        return self._base
+
+    def _name(self, name):
+        if self._name_tile[0] != name:
+            tile = Image.new("RGBA", (IMG_SIZE, TILE_H), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(tile)
+            font = resolve_font(REGULAR_FONTS)
+            draw.text(((IMG_SIZE - text_width(draw, name, font)) // 2, 0), name, fill=VALUE_COLOR, font=font)
+            self._name_tile = (name, tile)
+        return self._name_tile[1]
+
+    def _row(self, key, width):
+        tile = self._rows.get((key, width))
+        if tile is not None:
+            return tile
+        label, base, current, modifier = key
+        tile = Image.new("RGBA", (width, TILE_H), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(tile)
+        font = resolve_font(REGULAR_FONTS)
+        bold = resolve_font(BOLD_FONTS)
+        draw.text((0, 0), f"{label}: ", fill=LABEL_COLOR, font=font)
+        x = draw.textlength(f"{label}: ", font=font)
+        draw.text((x, 0), base, fill=VALUE_COLOR, font=bold)
+        x += draw.textlength(base, font=bold)
+        if current:
+            draw.text((x, 0), f" / {current}", fill=current_color(base, current), font=font)
+            x += draw.textlength(f" / {current}", font=font)
+        if modifier:
+            mod_str, mod_color = format_modifier(modifier)
+            draw.text((x, 0), f" ({mod_str})", fill=mod_color, font=font)
+        self._rows[(key, width)] = tile
+        return tile
+
+    def render(self, background_path, portrait_path, name, stats):
+        keys = [stat_row_key(k, v) for k, v in stats.items()]
+        half = (len(keys) + 1) // 2
+        columns = [keys[:half], keys[half:]]
+        rows = max(len(columns[0]), len(columns[1]))
+
+        img = self._base_layer(background_path, rows).copy()
+        name_tile = self._name(name)
+        img.paste(name_tile, (0, NAME_Y), name_tile)
+
+        used = {}
+        top = NAME_BOX_H + 2
+        for col, column in enumerate(columns):
+            x = COLUMN_X[col]
+            for i, key in enumerate(column):
+                tile = self._row(key, IMG_SIZE - x)
+                used[(key, IMG_SIZE - x)] = tile
+                img.paste(tile, (x, top + 2 + i * ROW_H), tile)
+        self._rows = used   # keep only what the current card shows
+        return img
+
+
+def compose_character_image(background_path, portrait_path, name, stats):
+    """One-off render; widgets should keep a CharacterRenderer instead."""
+    return CharacterRenderer().render(background_path, portrait_path, name, stats)
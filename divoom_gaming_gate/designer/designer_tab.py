@@ -1,4 +1,4 @@
-import os, json, base64, io, requests
+import os, json, base64, io
 from PIL import Image
 from PyQt5.QtCore import Qt, QUrl, pyqtSlot, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QColor, QIcon
@@ -9,6 +9,9 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtWebChannel import QWebChannel
 from ..utils.config import Config
+from ..utils.send_queue import get_send_queue, GifJob, force_requested
+from ..utils.device_state import data_digest
+from ..utils.decimate import decimate, MAX_DEVICE_FRAMES
 import importlib.resources
 import pixellab 
 import random
@@ -283,7 +286,7 @@ class DesignerTab(QWidget):
         send_layout.addLayout(select_lay)
 
         # Send to screen button
-        send_btn = QToolButton(text='Send 📤', toolTip="Send to screen", autoRaise=True)
+        send_btn = QToolButton(text='Send 📤', toolTip="Send to screen (Shift+click to re-send even if unchanged)", autoRaise=True)
         send_btn.setStyleSheet("color:white;font-size:18px")
         send_btn.clicked.connect(self._send)
         send_layout.addWidget(send_btn, alignment=Qt.AlignRight)
@@ -457,11 +460,11 @@ class DesignerTab(QWidget):
     def _set_font_size  (self,s ): self._js(f"var o=canvas.getActiveObject();if(o){{o.set('fontSize',{s});canvas.renderAll();}}")
 
     def _send(self):
-        import time
         ip = self.cfg.get_device_ip()
         if not ip:
             QMessageBox.warning(self, "No IP", "Configure the device IP in Settings.")
             return
+        force = force_requested()
 
         def process(frames_js):
             try:
@@ -469,41 +472,27 @@ class DesignerTab(QWidget):
                 if not frames:
                     QMessageBox.warning(self, "Export Error", "No frames exported.")
                     return
-                if len(frames) > 60:
-                    QMessageBox.warning(self, "Too many frames", "Maximum 60 frames allowed.")
-                    return
-
-                imgs = []
-                for entry in frames:
-                    url = entry if isinstance(entry, str) else entry.get("dataURL", "")
-                    b64_part = url.split(",", 1)[1] if "," in url else url
-                    img = Image.open(io.BytesIO(base64.b64decode(b64_part))).convert("RGB")
-                    imgs.append(img.resize((IMG_SIZE, IMG_SIZE)))
-
-                pic_id  = int(time.time())          # unique animation id
-                pic_num = len(imgs)
-
-                for idx, img in enumerate(imgs):
-                    buf = io.BytesIO()
-                    img.save(buf, format="JPEG", quality=85)
-                    b64_jpg = base64.b64encode(buf.getvalue()).decode()
-
-                    payload = {
-                        "Command":  "Draw/SendHttpGif",
-                        "LcdArray": [int(cb.isChecked()) for cb in self.screen_checks],
-                        "PicNum":   pic_num,
-                        "PicOffset":idx,
-                        "PicID":    pic_id,
-                        "PicSpeed": 100,
-                        "PicWidth": IMG_SIZE,
-                        "PicData":  b64_jpg
-                    }
-                    requests.post(f"http://{ip}/post", json=payload, timeout=8)
-
-                QMessageBox.information(
-                    self, "Send",
-                    f"Sent {pic_num} frame(s) animation as JPEG sequence."
-                )
+                urls = [e if isinstance(e, str) else e.get("dataURL", "") for e in frames]
+
+                def decode():
+                    # Runs on the encode pool, not the GUI thread
+                    imgs = []
+                    for url in urls:
+                        b64_part = url.split(",", 1)[1] if "," in url else url
+                        img = Image.open(io.BytesIO(base64.b64decode(b64_part))).convert("RGB")
+                        imgs.append(img.resize((IMG_SIZE, IMG_SIZE)))
+                    # The device takes at most 60; merge the most similar ones
+                    return decimate(imgs, MAX_DEVICE_FRAMES)
+
+                count = min(len(urls), MAX_DEVICE_FRAMES)
+                # Merged frames play longer so the loop keeps its length
+                speed = min(2000, int(round(100 * len(urls) / count)))
+                get_send_queue().submit(GifJob(
+                    f"Designer ({count} frame(s))", ip,
+                    [int(cb.isChecked()) for cb in self.screen_checks],
+                    loader=decode, speed=speed, quality=85, force=force,
+                    digest=data_digest("".join(urls), speed, 85)
+                ))
             except Exception as exc:
                 QMessageBox.critical(self, "Error", f"Failed to send:\n{exc}")
 
@@ -1,7 +1,10 @@
 # main.py
 
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QSplashScreen
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QTabWidget, QSplashScreen,
+    QWidget, QHBoxLayout, QLabel, QProgressBar, QPushButton, QMessageBox
+)
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QFont
 from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation
 import importlib.resources
@@ -11,9 +14,99 @@ from .characters.characters_tab import CharactersTab
 from .tools.tools_tab import ToolsTab
 from .designer.designer_tab import DesignerTab
 from .settings.settings_tab import SettingsTab
+from .utils.send_queue import get_send_queue
 from importlib.metadata import version, PackageNotFoundError
 import os
 
+class SendStatus(QWidget):
+    """Status bar widget that follows the background send queue."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.queue = get_send_queue()
+        self.current_job = None
+        self._error_shown = False
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(4, 0, 4, 0)
+        self.label = QLabel("")
+        self.label.setStyleSheet("color: #aaa;")
+        self.progress = QProgressBar()
+        self.progress.setFixedWidth(200)
+        self.progress.setVisible(False)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setToolTip("Cancel the current upload")
+        self.cancel_btn.clicked.connect(self.cancel_current)
+        self.cancel_btn.setVisible(False)
+        self.cancel_all_btn = QPushButton("Cancel All")
+        self.cancel_all_btn.clicked.connect(self.queue.cancel_all)
+        self.cancel_all_btn.setVisible(False)
+        layout.addWidget(self.label)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.cancel_btn)
+        layout.addWidget(self.cancel_all_btn)
+
+        self.queue.job_started.connect(self._on_started)
+        self.queue.job_progress.connect(self._on_progress)
+        self.queue.job_finished.connect(self._on_done)
+        self.queue.job_cancelled.connect(self._on_cancelled)
+        self.queue.job_failed.connect(self._on_failed)
+        self.queue.job_skipped.connect(self._on_skipped)
+
+    def cancel_current(self):
+        if self.current_job is not None:
+            self.queue.cancel(self.current_job)
+
+    def _on_started(self, job_id, label, total):
+        self.current_job = job_id
+        self.label.setText(f"Sending {label}")
+        self.progress.setRange(0, max(total, 1))
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self.cancel_btn.setVisible(True)
+        self.cancel_all_btn.setVisible(self.queue.pending() > 1)
+
+    def _on_progress(self, job_id, done, total):
+        if job_id == self.current_job:
+            self.progress.setValue(done)
+
+    def _on_done(self, job_id):
+        self._finish(job_id, "Sent")
+
+    def _on_cancelled(self, job_id):
+        self._finish(job_id, "Cancelled")
+
+    def _on_skipped(self, job_id, label):
+        if self.current_job is None:
+            self.label.setText(f"{label} unchanged, skipped (Shift+Send to force)")
+
+    def _on_failed(self, job_id, message):
+        self._finish(job_id, "Send failed")
+        if self._error_shown:
+            return
+        self._error_shown = True
+        if self.queue.can_resume(job_id):
+            reply = QMessageBox.warning(
+                self, "Network Error",
+                f"Failed to send to device:\n{message}\n\nResume failed uploads from the first missing frame?",
+                QMessageBox.Retry | QMessageBox.Close, QMessageBox.Retry
+            )
+            if reply == QMessageBox.Retry:
+                self.queue.resume_all()
+        else:
+            QMessageBox.warning(self, "Network Error", f"Failed to send to device:\n{message}")
+        self._error_shown = False
+
+    def _finish(self, job_id, text):
+        if job_id != self.current_job:
+            return
+        self.current_job = None
+        # The worker may not have dropped this job yet; the next job_started re-shows the bar
+        if self.queue.pending() <= 1:
+            self.progress.setVisible(False)
+            self.cancel_btn.setVisible(False)
+            self.cancel_all_btn.setVisible(False)
+            self.label.setText(text)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -27,6 +120,7 @@ class MainWindow(QMainWindow):
         tabs.addTab(DesignerTab(),   "Designer")
         tabs.addTab(settings_tab, "Settings")  
         self.setCentralWidget(tabs)
+        self.statusBar().addPermanentWidget(SendStatus(self), 1)
 
 def get_current_version():
     try:
@@ -0,0 +1,44 @@
+# mock_device/__main__.py
+#
+#   python -m divoom_gaming_gate.mock_device --port 8080 --out mock_output
+#
+# then set the device IP in Settings to 127.0.0.1:8080.
+
+import argparse
+
+from .server import MockDevice
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for a Divoom Times Gate.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--out", default=None, help="write reassembled animations here as GIFs")
+    parser.add_argument("--latency", type=float, default=0.0, help="added latency per request, in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- latency jitter, in ms")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="bandwidth cap in KB/s (0 = unlimited)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with --fail-status")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of connections dropped without a reply")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    device = MockDevice(
+        host=args.host, port=args.port, out_dir=args.out,
+        latency=args.latency / 1000.0, jitter=args.jitter / 1000.0,
+        bandwidth=args.bandwidth * 1024, fail_rate=args.fail_rate,
+        fail_status=args.fail_status, drop_rate=args.drop_rate, seed=args.seed,
+    )
+    device.httpd.verbose = args.verbose
+    print(f"Mock Times Gate listening on http://{device.address}/post")
+    try:
+        device.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# mock_device/server.py
+
+import base64
+import io
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+SCREEN_COUNT = 5
+
+# Required fields and their types for every command the app sends
+COMMAND_FIELDS = {
+    "Draw/SendHttpGif": {
+        "LcdArray": list, "PicNum": int, "PicOffset": int, "PicID": int,
+        "PicSpeed": int, "PicWidth": int, "PicData": str,
+    },
+    "Draw/SendHttpText": {
+        "LcdId": int, "TextId": int, "x": int, "y": int, "dir": int, "font": int,
+        "TextWidth": int, "speed": int, "TextString": str, "color": str, "align": int,
+    },
+    "Draw/CommandList": {"CommandList": list},
+    "Tools/SetScoreBoard": {"BlueScore": int, "RedScore": int},
+    "Tools/SetTimer": {"Minute": int, "Second": int, "Status": int},
+    "Tools/SetStopWatch": {"Status": int},
+    "Tools/SetNoiseStatus": {"NoiseStatus": int},
+    "Channel/SetBrightness": {"Brightness": int},
+    "Channel/OnOffScreen": {"OnOff": int},
+    "Sys/TimeZone": {"TimeZoneValue": str},
+    "Device/SetUTC": {"Utc": int},
+    "Device/SetTime24Flag": {"Mode": int},
+    "Device/PlayBuzzer": {"ActiveTimeInCycle": int, "OffTimeInCycle": int, "PlayTotalTime": int},
+    "Device/SysReboot": {},
+}
+
+
+class PayloadError(Exception):
+    pass
+
+
+def validate(payload):
+    if not isinstance(payload, dict):
+        raise PayloadError("payload must be a JSON object")
+    name = payload.get("Command")
+    fields = COMMAND_FIELDS.get(name)
+    if fields is None:
+        raise PayloadError(f"unknown command {name!r}")
+    for field, kind in fields.items():
+        if field not in payload:
+            raise PayloadError(f"{name}: missing {field}")
+        value = payload[field]
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise PayloadError(f"{name}: {field} must be {kind.__name__}")
+    if name == "Draw/SendHttpGif":
+        lcd = payload["LcdArray"]
+        if len(lcd) != SCREEN_COUNT or any(v not in (0, 1) for v in lcd):
+            raise PayloadError("Draw/SendHttpGif: LcdArray must be five 0/1 flags")
+        if not 0 < payload["PicNum"] <= 60:
+            raise PayloadError("Draw/SendHttpGif: PicNum must be 1-60")
+        if not 0 <= payload["PicOffset"] < payload["PicNum"]:
+            raise PayloadError("Draw/SendHttpGif: PicOffset out of range")
+    if name == "Draw/SendHttpText" and not 0 <= payload["LcdId"] < SCREEN_COUNT:
+        raise PayloadError("Draw/SendHttpText: LcdId out of range")
+    return name
+
+
+class MockDevice:
+    """Stand-in for a Times Gate's /post endpoint.
+
+    Animations are reassembled by PicID/PicOffset and written to ``out_dir``
+    as GIFs (``lcd<N>.gif`` is always the latest one on that LCD). Latency,
+    bandwidth and failures can be injected to exercise the send pipeline.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, out_dir=None, latency=0.0, jitter=0.0,
+                 bandwidth=0, fail_rate=0.0, fail_status=503, drop_rate=0.0, seed=None):
+        self.out_dir = out_dir
+        self.latency = latency        # seconds per request
+        self.jitter = jitter          # +/- seconds
+        self.bandwidth = bandwidth    # bytes/sec, 0 = unlimited
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+        handler = type("Handler", (MockHandler,), {"device": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    def reset(self):
+        with self.lock:
+            self.settings = {}
+            self.stats = {"requests": 0, "bytes": 0, "failed": 0, "dropped": 0, "invalid": 0, "commands": {}}
+        self.reboot()
+
+    def reboot(self):
+        with self.lock:
+            self.uploads = {}                  # PicID -> {"lcd", "num", "speed", "frames"}
+            self.screens = [None] * SCREEN_COUNT
+            self.texts = {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "screens": list(self.screens),
+                "texts": dict(self.texts),
+                "settings": dict(self.settings),
+                "stats": dict(self.stats, commands=dict(self.stats["commands"])),
+            }
+
+    # --- request handling ---
+    def delay(self, body_len):
+        wait = self.latency
+        if self.jitter:
+            wait += self.random.uniform(-self.jitter, self.jitter)
+        if self.bandwidth:
+            wait += body_len / float(self.bandwidth)
+        if wait > 0:
+            time.sleep(wait)
+
+    def inject_failure(self):
+        """Return 'drop', 'fail' or None."""
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.drop_rate:
+            return "drop"
+        if roll < self.drop_rate + self.fail_rate:
+            return "fail"
+        return None
+
+    def handle(self, payload):
+        name = validate(payload)
+        with self.lock:
+            cmds = self.stats["commands"]
+            cmds[name] = cmds.get(name, 0) + 1
+        if name == "Draw/CommandList":
+            for sub in payload["CommandList"]:
+                if validate(sub) in ("Draw/CommandList", "Draw/SendHttpGif"):
+                    raise PayloadError("Draw/CommandList: nested command not allowed")
+            for sub in payload["CommandList"]:
+                self.handle(sub)
+        elif name == "Draw/SendHttpGif":
+            self._handle_gif(payload)
+        elif name == "Draw/SendHttpText":
+            with self.lock:
+                self.texts[payload["LcdId"]] = payload["TextString"]
+        elif name == "Device/SysReboot":
+            self.reboot()
+        else:
+            with self.lock:
+                fields = {k: v for k, v in payload.items() if k != "Command"}
+                self.settings[name] = fields
+
+    def _handle_gif(self, payload):
+        try:
+            frame = Image.open(io.BytesIO(base64.b64decode(payload["PicData"])))
+            frame.load()
+        except Exception as e:
+            raise PayloadError(f"Draw/SendHttpGif: PicData is not an image ({e})")
+        if frame.size != (payload["PicWidth"], payload["PicWidth"]):
+            raise PayloadError(f"Draw/SendHttpGif: frame is {frame.size}, PicWidth is {payload['PicWidth']}")
+        pic_id = payload["PicID"]
+        with self.lock:
+            upload = self.uploads.get(pic_id)
+            if upload is None or upload["num"] != payload["PicNum"]:
+                upload = {"lcd": payload["LcdArray"], "num": payload["PicNum"],
+                          "speed": payload["PicSpeed"], "frames": {}}
+                self.uploads[pic_id] = upload
+            upload["frames"][payload["PicOffset"]] = frame.convert("RGB")
+            if len(upload["frames"]) < upload["num"]:
+                return
+            del self.uploads[pic_id]
+            frames = [upload["frames"][i] for i in range(upload["num"])]
+            for i, on in enumerate(upload["lcd"]):
+                if on:
+                    self.screens[i] = {"pic_id": pic_id, "frames": len(frames), "speed": upload["speed"]}
+                    self.texts.pop(i, None)
+        if self.out_dir:
+            self._write_gif(pic_id, upload["lcd"], frames, upload["speed"])
+
+    def _write_gif(self, pic_id, lcd, frames, speed):
+        buf = io.BytesIO()
+        frames[0].save(buf, format="GIF", save_all=True, append_images=frames[1:],
+                       duration=speed, loop=0)
+        data = buf.getvalue()
+        with open(os.path.join(self.out_dir, f"{pic_id}.gif"), "wb") as f:
+            f.write(data)
+        for i, on in enumerate(lcd):
+            if on:
+                with open(os.path.join(self.out_dir, f"lcd{i}.gif"), "wb") as f:
+                    f.write(data)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    device = None
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        # Current mirror of the device, handy when poking at it from a browser
+        self._reply(200, self.device.snapshot())
+
+    def do_POST(self):
+        device = self.device
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        with device.lock:
+            device.stats["requests"] += 1
+            device.stats["bytes"] += length
+        if self.path != "/post":
+            self._reply(404, {"error_code": "not found"})
+            return
+        device.delay(length)
+        failure = device.inject_failure()
+        if failure == "drop":
+            with device.lock:
+                device.stats["dropped"] += 1
+            self.close_connection = True
+            self.connection.close()
+            return
+        if failure == "fail":
+            with device.lock:
+                device.stats["failed"] += 1
+            self._reply(device.fail_status, {"error_code": "injected failure"})
+            return
+        try:
+            device.handle(json.loads(body))
+        except (ValueError, PayloadError) as e:
+            with device.lock:
+                device.stats["invalid"] += 1
+            self._reply(400, {"error_code": str(e)})
+            return
+        self._reply(200, {"error_code": 0})
+
+    def log_message(self, fmt, *args):
+        if getattr(self.server, "verbose", False):
+            super().log_message(fmt, *args)
@@ -1,19 +1,23 @@
 from ..utils.config import Config
-import time, io, base64, requests
-from PIL import Image, ImageSequence
+import base64, requests
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QFileDialog, QSpinBox, QSlider, QComboBox, QDialog, QLineEdit, QListWidget, QListWidgetItem, QMessageBox
 )
-from PyQt5.QtGui import QPixmap, QImage, QIcon
-from PyQt5.QtCore import Qt, QTimer, QSize
-from io import BytesIO
+from PyQt5.QtCore import Qt, QTimer, QSize, QThread, pyqtSignal
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtWebChannel import QWebChannel
 from PyQt5.QtCore import pyqtSlot, QObject
 import os
 import json
 from ..utils.paths import SETTINGS_FILE
+from ..utils.image import normalize_frame, open_source, iter_frames
+from ..utils.frame_store import FrameStore, reduce_frame
+from ..utils.decimate import decimate_indices, MAX_DEVICE_FRAMES
+from ..utils.pacing import get_pacer
+from ..utils.preview_clock import get_preview_clock, pil_to_pixmap
+from ..utils.send_queue import get_send_queue, GifJob, lcd_array_for, force_requested
+from ..themes.theme_file import source_digest, encoding_key
 
 # IP from config
 from ..utils.config import Config
@@ -42,20 +46,73 @@ def get_tenor_settings():
         )
     return "", "medium"
 
+class FrameLoader(QThread):
+    """Decodes the rest of an animation off the GUI thread, keeping only
+    every ``skip``-th frame, and hands them over in small batches."""
+
+    frames_ready = pyqtSignal(int, list)   # (generation, [(raw, normalized), ...])
+    done         = pyqtSignal(int)
+    failed       = pyqtSignal(int, str)
+
+    BATCH = 8
+
+    def __init__(self, generation, source, skip, mode, parent=None):
+        super().__init__(parent)
+        self.generation = generation
+        self.source = source
+        self.skip = skip
+        self.mode = mode
+
+    def run(self):
+        try:
+            batch = []
+            # Frame 0 is already on screen
+            for raw in iter_frames(open_source(self.source), self.skip, start=self.skip):
+                if self.isInterruptionRequested():
+                    return
+                batch.append((reduce_frame(raw), normalize_frame(raw, self.mode, IMG_SIZE)))
+                if len(batch) >= self.BATCH:
+                    self.frames_ready.emit(self.generation, batch)
+                    batch = []
+            if batch:
+                self.frames_ready.emit(self.generation, batch)
+            self.done.emit(self.generation)
+        except Exception as e:
+            self.failed.emit(self.generation, str(e))
+
+
 class ScreenControl(QWidget):
     def __init__(self, screen_index):
         super().__init__()
         self.screen_index = screen_index
 
         # Raw/processed frames and preview index
-        self.raw_frames = []
+        self.raw_frames = FrameStore(budget=0)   # source frames, RAM-bounded
         self.frames     = []
         self.preview_idx = 0
+        self._pixmaps   = []    # one QPixmap per entry in self.frames
+        self._normalized = {}   # import mode -> one 128x128 frame per raw frame
+
+        # Where raw_frames came from, so a skip change can re-decode
+        self.source = None
+        self.source_origin = ""
+        self.decoded_skip = 1
+        self._loader = None
+        self._load_gen = 0
+        self._load_pending = False
+
+        # Theme screen these frames were loaded from, and what the screen
+        # looked like right after, so an untouched screen is saved as stored
+        self.stored_screen = None
+        self._stored_fingerprint = None
 
         # Settings
         self.speed   = DEFAULT_SPEED
         self.quality = DEFAULT_QUALITY
         self.skip    = 1
+        self.max_frames = MAX_DEVICE_FRAMES   # 0 = no reduction
+        self.speed_scale = 1.0                # frames merged by reduction play longer
+        self.size_limit = 0   # KB, 0 = use quality
 
         # UI setup
         self.label = QLabel(f"Screen {screen_index+1}")
@@ -64,9 +121,8 @@ class ScreenControl(QWidget):
         self.preview.setStyleSheet("border:1px solid white;")
         self.preview.setAlignment(Qt.AlignCenter)
 
-        # Timer for animation
-        self.anim_timer = QTimer(self)
-        self.anim_timer.timeout.connect(self._advance_preview)
+        # Animation is driven by the app-wide preview clock
+        self.clock = get_preview_clock()
 
         # Controls
         self.mode_combo = QComboBox()
@@ -79,6 +135,7 @@ class ScreenControl(QWidget):
 
         self.load_btn.setStyleSheet("QPushButton:hover { background: #222; }")
         self.send_btn.setStyleSheet("QPushButton:hover { background: #222; }")
+        self.send_btn.setToolTip("Send to this screen (Shift+click to re-send even if unchanged)")
         self.gif_browser_btn.setStyleSheet("QPushButton:hover { background: #222; }")
 
         self.speed_box = QSpinBox()
@@ -92,11 +149,33 @@ class ScreenControl(QWidget):
         self.skip_box.setValue(self.skip)
         self.skip_box.valueChanged.connect(self._on_skip_changed)
 
+        # Smart reduction: drop near-duplicate frames, keep motion
+        self.reduce_box = QSpinBox()
+        self.reduce_box.setRange(0, MAX_DEVICE_FRAMES)
+        self.reduce_box.setSpecialValueText("Off")
+        self.reduce_box.setValue(self.max_frames)
+        self.reduce_box.setToolTip("Merge near-identical frames until the animation fits this budget")
+        self.reduce_box.valueChanged.connect(self._on_reduce_changed)
+        self.reduce_unit = QComboBox()
+        self.reduce_unit.addItems(["frames", "s upload"])
+        self.reduce_unit.currentIndexChanged.connect(self._on_reduce_changed)
+
         self.quality_slider = QSlider(Qt.Horizontal)
         self.quality_slider.setRange(40, 95)
         self.quality_slider.setValue(self.quality)
         self.quality_slider.valueChanged.connect(lambda v: setattr(self, "quality", v))
 
+        # Optional byte budget; quality is then picked per frame to fit it
+        self.size_box = QSpinBox()
+        self.size_box.setRange(0, 2000)
+        self.size_box.setSpecialValueText("Off")
+        self.size_box.setSuffix(" KB")
+        self.size_box.setValue(self.size_limit)
+        self.size_box.setToolTip("Pick JPEG quality per frame to stay under this size (overrides Image Quality)")
+        self.size_box.valueChanged.connect(self._on_size_limit_changed)
+        self.size_scope = QComboBox()
+        self.size_scope.addItems(["per frame", "per animation"])
+
         # Layout
         main = QVBoxLayout()
         main.setAlignment(Qt.AlignTop)
@@ -118,7 +197,13 @@ class ScreenControl(QWidget):
 
         main.addLayout(self._labeled_row("Frame Speed:", self.speed_box))
         main.addLayout(self._labeled_row("Frame Skip:",  self.skip_box))
+        rrow = QHBoxLayout()
+        rrow.addWidget(QLabel("Max Frames:")); rrow.addWidget(self.reduce_box); rrow.addWidget(self.reduce_unit)
+        main.addLayout(rrow)
         main.addLayout(self._labeled_row("Image Quality:", self.quality_slider))
+        srow = QHBoxLayout()
+        srow.addWidget(QLabel("Size Limit:")); srow.addWidget(self.size_box); srow.addWidget(self.size_scope)
+        main.addLayout(srow)
 
         self.setLayout(main)
 
@@ -139,13 +224,46 @@ class ScreenControl(QWidget):
         return row
 
     def _on_speed_changed(self, v):
-        self.speed = v
-        if self.anim_timer.isActive():
-            self.anim_timer.start(self.speed)
+        self.speed = v   # the preview clock reads play_speed() on every tick
+
+    def _on_reduce_changed(self, *_):
+        self.max_frames = self.reduce_box.value()
+        if not self._loading():
+            self.apply_mode()
+
+    def send_budget(self):
+        """GifJob byte-budget kwargs from the Size Limit controls (empty = use quality)."""
+        if not self.size_limit:
+            return {}
+        key = "frame_bytes" if self.size_scope.currentIndex() == 0 else "total_bytes"
+        return {key: self.size_limit * 1024}
+
+    def play_speed(self):
+        """Frame time actually used, stretched to cover frames merged away by reduction."""
+        return min(2000, int(round(self.speed * self.speed_scale)))
+
+    def frame_budget(self):
+        """Most frames to keep, from the Max Frames setting (0 = unlimited)."""
+        if not self.max_frames:
+            return 0
+        if self.reduce_unit.currentIndex() == 0:
+            return self.max_frames
+        # Seconds of upload time at the rate this device has sustained so far
+        pacer = get_pacer(DEVICE_IP) if DEVICE_IP else None
+        rate = pacer.best_rate if pacer else 5.0
+        return max(1, min(MAX_DEVICE_FRAMES, int(self.max_frames * rate)))
 
     def _on_skip_changed(self, v):
         self.skip = v
-        self.apply_mode()  # rebuild self.frames with new skip
+        if self.source is not None and (v % self.decoded_skip or self._loading()):
+            # Frames we need were never decoded
+            self._load_source(self.source, self.source_origin)
+        else:
+            self.apply_mode()  # rebuild self.frames with new skip
+
+    def _on_size_limit_changed(self, v):
+        self.size_limit = v
+        self.quality_slider.setEnabled(v == 0)
 
     def load_image(self):
         path, _ = QFileDialog.getOpenFileName(
@@ -154,47 +272,108 @@ class ScreenControl(QWidget):
         if not path:
             return
 
-        img = Image.open(path)
+        self._load_source(path)
+
+    def _load_source(self, source, origin=""):
+        """Show the first frame right away and decode the rest in the background."""
+        self._stop_loader()
+        img = open_source(source)
+        self.source = source
+        self.stored_screen = None
+        self.source_origin = origin
+        self.decoded_skip = self.skip
+        self.raw_frames.close()
+        self.raw_frames = FrameStore(frames=[img.convert("RGB")])
+        self._normalized = {}
+        self.apply_mode()
         if getattr(img, "is_animated", False):
-            self.raw_frames = [fr.convert("RGB") for fr in ImageSequence.Iterator(img)]
+            self._load_gen += 1
+            self._loader = FrameLoader(self._load_gen, source, self.skip, self.mode_combo.currentText(), self)
+            self._loader.frames_ready.connect(self._on_frames_loaded)
+            self._loader.done.connect(self._on_load_done)
+            self._loader.failed.connect(self._on_load_failed)
+            self.send_btn.setEnabled(False)
+            self._load_pending = True
+            self.label.setText("Loading...")
+            self._loader.start()
         else:
-            self.raw_frames = [img.convert("RGB")]
-
-        self.label.setText(f"Loaded {len(self.raw_frames)} frame(s)")
-        self.apply_mode()
+            self._on_load_done(self._load_gen)
         self._start_animation()
 
+    def _loading(self):
+        return self._load_pending
+
+    def _stop_loader(self):
+        self._load_gen += 1   # drop anything still in flight
+        if self._loader is not None:
+            self._loader.requestInterruption()
+            self._loader.wait()
+            self._loader = None
+        self._load_pending = False
+        self.send_btn.setEnabled(True)
+
+    def _on_frames_loaded(self, gen, batch):
+        if gen != self._load_gen:
+            return
+        mode = self.mode_combo.currentText()
+        loader_norm = self._normalized.setdefault(self._loader.mode, [])
+        step = max(1, self.skip // self.decoded_skip)
+        for raw, norm in batch:
+            index = len(self.raw_frames)
+            self.raw_frames.append(raw)
+            if len(loader_norm) == index:
+                loader_norm.append(norm)
+            current = self._normalized_for(mode)
+            if index % step == 0:
+                self.frames.append(current[index])
+                self._pixmaps.append(pil_to_pixmap(current[index]))
+        self.label.setText(f"Loading... {len(self.frames)} frame(s)")
+        if not self.clock.is_running(self.preview):
+            self._start_animation()
+
+    def _on_load_done(self, gen):
+        if gen != self._load_gen:
+            return
+        self._load_pending = False
+        self.send_btn.setEnabled(True)
+        if self.frame_budget() and len(self.frames) > self.frame_budget():
+            self.apply_mode()   # reduce now that every frame is in
+        self.label.setText(f"Loaded {len(self.frames)} frame(s){self.source_origin}")
+
+    def _on_load_failed(self, gen, error):
+        if gen != self._load_gen:
+            return
+        self._load_pending = False
+        self.send_btn.setEnabled(True)
+        self.label.setText(f"Loaded {len(self.frames)} frame(s) (decode stopped: {error})")
+
+    def _normalized_for(self, mode):
+        """Every raw frame resized for ``mode``; each mode is only computed once."""
+        norm = self._normalized.setdefault(mode, [])
+        for img in self.raw_frames.iter_from(len(norm)):
+            norm.append(normalize_frame(img, mode, IMG_SIZE))
+        return norm
+
     def apply_mode(self):
         mode = self.mode_combo.currentText()
-        proc = []
-        for img in self.raw_frames:
-            w,h = img.size
-            if mode == "Stretch":
-                norm = img.resize((IMG_SIZE, IMG_SIZE), Image.LANCZOS)
-            elif mode == "Fit":
-                thumb = img.copy()
-                thumb.thumbnail((IMG_SIZE,IMG_SIZE), Image.LANCZOS)
-                bg = Image.new("RGB",(IMG_SIZE,IMG_SIZE),(0,0,0))
-                bg.paste(thumb, ((IMG_SIZE-thumb.width)//2,(IMG_SIZE-thumb.height)//2))
-                norm = bg
-            elif mode == "Crop":
-                side = min(w,h)
-                left = (w-side)//2; top=(h-side)//2
-                crop = img.crop((left,top,left+side,top+side))
-                norm = crop.resize((IMG_SIZE,IMG_SIZE),Image.LANCZOS)
-            else:
-                norm = img.resize((IMG_SIZE,IMG_SIZE), Image.LANCZOS)
-            proc.append(norm)
-        # apply skip
-        self.frames = proc[::self.skip] or proc[:1]
+        # raw_frames already had decoded_skip applied, so skip is just a slice
+        step = max(1, self.skip // self.decoded_skip)
+        frames = self._normalized_for(mode)[::step]
+        self.speed_scale = 1.0
+        budget = self.frame_budget()
+        if budget and len(frames) > budget and not self._loading():
+            self.speed_scale = len(frames) / float(budget)
+            frames = [frames[i] for i in decimate_indices(frames, budget)]
+        self.frames = frames
+        self._pixmaps = [pil_to_pixmap(f) for f in frames]
         self.preview_idx = 0
         self.update_preview()
 
     def _start_animation(self):
         if len(self.frames) > 1:
-            self.anim_timer.start(self.speed)
+            self.clock.start(self.preview, self.play_speed, self._advance_preview)
         else:
-            self.anim_timer.stop()
+            self.clock.stop(self.preview)
 
     def _advance_preview(self):
         if not self.frames:
@@ -205,10 +384,7 @@ class ScreenControl(QWidget):
     def update_preview(self):
         if not self.frames:
             return
-        img = self.frames[self.preview_idx]
-        data = img.tobytes("raw","RGB")
-        qimg = QImage(data, img.width, img.height, QImage.Format_RGB888)
-        self.preview.setPixmap(QPixmap.fromImage(qimg))
+        self.preview.setPixmap(self._pixmaps[self.preview_idx])
 
     def send_to_screen(self):
         # Refresh IP
@@ -222,31 +398,12 @@ class ScreenControl(QWidget):
             QMessageBox.warning(self, "No IP Set", "Please set the Divoom device IP in the settings before sending.")
             return
 
-        frames_to_send = self.frames
-        pic_id = int(time.time())
-        lcd = [0]*SCREEN_COUNT
-        lcd[self.screen_index] = 1
-
-        for offset, frame in enumerate(frames_to_send):
-            buf = io.BytesIO()
-            frame.save(buf, format="JPEG", quality=self.quality)
-            b64 = base64.b64encode(buf.getvalue()).decode()
-
-            payload = {
-                "Command":   "Draw/SendHttpGif",
-                "LcdArray":  lcd,
-                "PicNum":    len(frames_to_send),
-                "PicOffset": offset,
-                "PicID":     pic_id,
-                "PicSpeed":  self.speed,
-                "PicWidth":  IMG_SIZE,
-                "PicData":   b64
-            }
-            try:
-                requests.post(f"http://{DEVICE_IP}/post", json=payload)
-            except Exception as e:
-                QMessageBox.warning(self, "Network Error", f"Failed to send to device:\n{e}")
-                break
+        job = GifJob(
+            f"Screen {self.screen_index+1}", DEVICE_IP, lcd_array_for(self.screen_index),
+            frames=self.frames, speed=self.play_speed(), quality=self.quality,
+            force=force_requested(), **self.send_budget()
+        )
+        get_send_queue().submit(job)
 
     def open_gif_browser(self):
         api_key, tenor_filter = get_tenor_settings()
@@ -270,37 +427,58 @@ class ScreenControl(QWidget):
         try:
             resp = requests.get(url, timeout=10)
             resp.raise_for_status()
-            img = Image.open(BytesIO(resp.content))
-            if getattr(img, "is_animated", False):
-                self.raw_frames = [fr.convert("RGB") for fr in ImageSequence.Iterator(img)]
-            else:
-                self.raw_frames = [img.convert("RGB")]
-            self.label.setText(f"Loaded {len(self.raw_frames)} frame(s) from Tenor")
-            self.apply_mode()
-            self._start_animation()
+            self._load_source(resp.content, " from Tenor")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load GIF from Tenor:\n{e}")
 
     def clear_image(self):
-        self.raw_frames = []
+        self._stop_loader()
+        self.source = None
+        self.stored_screen = None
+        self.raw_frames.close()
+        self.raw_frames = FrameStore(budget=0)
+        self._normalized = {}
         self.frames = []
+        self._pixmaps = []
         self.preview_idx = 0
+        self.clock.stop(self.preview)
         self.label.setText("No image loaded")
         self.preview.clear()  # <-- This line clears the preview area
 
-    def load_from_theme_data(self, screen_data):
-        import base64, io
-        from PIL import Image, ImageSequence
-        img_type = screen_data["type"]
-        img_data = base64.b64decode(screen_data["data"])
-        if img_type == "gif":
-            img = Image.open(io.BytesIO(img_data))
-            self.raw_frames = [fr.convert("RGB") for fr in ImageSequence.Iterator(img)]
-        else:
-            img = Image.open(io.BytesIO(img_data)).convert("RGB")
-            self.raw_frames = [img]
+    def load_frames(self, frames, speed=None, stored=None):
+        """Show already-decoded 128x128 frames (e.g. a binary theme screen).
+
+        ``stored`` is the ThemeScreen they came from, reused as is by the
+        next save if the screen isn't changed in the meantime.
+        """
+        self._stop_loader()
+        self.source = None
+        self.decoded_skip = 1
+        self.raw_frames.close()
+        self.raw_frames = FrameStore(frames=frames)
+        self._normalized = {}
+        if speed:
+            self.speed_box.setValue(speed)
         self.apply_mode()
+        self.label.setText(f"Loaded {len(self.frames)} frame(s)")
         self._start_animation()
+        self.stored_screen = stored
+        self._stored_fingerprint = self.save_fingerprint() if stored else None
+
+    def save_fingerprint(self):
+        """Digest of the frames, speed and encoding settings a save would use."""
+        return source_digest(self.frames, self.play_speed(), encoding_key(self.quality, self.send_budget()))
+
+    def unchanged_stored_screen(self):
+        """The theme screen this was loaded from, if nothing changed since."""
+        if self.stored_screen is None or not self.frames:
+            return None
+        if self.save_fingerprint() != self._stored_fingerprint:
+            return None
+        return self.stored_screen
+
+    def load_from_theme_data(self, screen_data):
+        self._load_source(base64.b64decode(screen_data["data"]))
 
 from PyQt5.QtCore import QObject, pyqtSlot
 
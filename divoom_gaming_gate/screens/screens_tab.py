@@ -1,15 +1,114 @@
-from PyQt5.QtWidgets import QWidget, QHBoxLayout, QGroupBox, QVBoxLayout, QSizePolicy, QPushButton, QInputDialog, QMessageBox, QFileDialog
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QGroupBox, QVBoxLayout, QSizePolicy, QPushButton, QInputDialog, QMessageBox, QFileDialog, QProgressDialog
 from .screen_control import ScreenControl
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 import os
-import json
-import base64
-import io
-from PIL import Image
 
 from divoom_gaming_gate.utils.paths import THEMES_DIR
+from divoom_gaming_gate.utils.encoding import DEFAULT_QUALITY, get_encode_pool
+from divoom_gaming_gate.utils.blob_store import get_blob_store
+from divoom_gaming_gate.themes.theme_file import (
+    read_theme, write_theme, encode_screen, blank_screen, make_preview_strip, source_digest,
+    encoding_key, DEFAULT_SPEED
+)
+
+def snapshot_screens(screen_controls):
+    """What each screen would be saved from (None for blank ones), copied so
+    the screens can keep being edited while a save runs."""
+    screens = []
+    for sc in screen_controls:
+        if getattr(sc, "frames", None):
+            screens.append({
+                "frames": list(sc.frames), "speed": sc.play_speed(),
+                "quality": sc.quality, "budget": sc.send_budget(),
+                "stored": sc.unchanged_stored_screen(),
+            })
+        else:
+            screens.append(None)
+    return screens
+
+
+def previous_screens(theme_path):
+    """Screen entries of the theme being replaced, keyed by source digest."""
+    if not os.path.exists(theme_path):
+        return {}
+    try:
+        header = read_theme(theme_path).header
+    except Exception:
+        return {}
+    return {e["source"]: e for e in header.get("screens", ()) if "source" in e}
+
+
+def _blobs_present(entry, store):
+    # A loaded or replaced theme may have been deleted and its frames collected since
+    return all(store.has(k) for k in entry["blobs"])
+
+
+class ThemeSaver(QThread):
+    """Encodes and writes a theme off the GUI thread.
+
+    Screens whose frames, speed and encoding settings match a screen of the
+    theme being overwritten are kept as they are; the rest are encoded in
+    parallel on the shared encode pool. The file is replaced atomically.
+    """
+    progress = pyqtSignal(int, int)   # steps done, total steps
+    saved    = pyqtSignal(str)        # theme name
+    failed   = pyqtSignal(str)
+
+    def __init__(self, theme_path, theme_name, screens, parent=None):
+        super().__init__(parent)
+        self.theme_path = theme_path
+        self.theme_name = theme_name
+        self.screens = screens
+
+    def run(self):
+        try:
+            self._save()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.saved.emit(self.theme_name)
+
+    def _save(self):
+        previous = previous_screens(self.theme_path)
+        store = get_blob_store()
+        steps = len(self.screens) + 1   # one per screen, plus writing the file
+        out = [None] * len(self.screens)
+        pending = {}
+        for i, screen in enumerate(self.screens):
+            if screen is None:
+                out[i] = (blank_screen(), DEFAULT_SPEED, DEFAULT_QUALITY)
+                continue
+            stored = screen["stored"]
+            if stored is not None and _blobs_present(stored.entry, store):
+                # Loaded from a theme and left alone: keep its blobs as they are
+                out[i] = stored.entry
+                continue
+            budget = screen["budget"]
+            source = source_digest(screen["frames"], screen["speed"], encoding_key(screen["quality"], budget))
+            if source in previous and _blobs_present(previous[source], store):
+                out[i] = previous[source]   # unchanged since the last save
+                continue
+            # Stored exactly as Send would encode them
+            future = get_encode_pool().submit(
+                encode_screen, screen["frames"], quality=screen["quality"], **budget
+            )
+            pending[i] = (future, source)
+        done = len(self.screens) - len(pending)
+        self.progress.emit(done, steps)
+        for i, (future, source) in pending.items():
+            screen = self.screens[i]
+            quality = None if screen["budget"] else screen["quality"]
+            out[i] = (future.result(), screen["speed"], quality, source)
+            done += 1
+            self.progress.emit(done, steps)
+        # The Themes tab shows only this strip and never decodes the frames
+        strip = make_preview_strip([s["frames"] if s else [] for s in self.screens])
+        write_theme(self.theme_path, self.theme_name, out, preview=strip)
+        self.progress.emit(steps, steps)
+
 
 def save_theme_file(theme_name, screen_controls, parent=None):
+    """Ask before overwriting, then return a ThemeSaver ready to start (None if cancelled)."""
     theme_path = os.path.join(THEMES_DIR, f"{theme_name}.theme")
     if os.path.exists(theme_path):
         # Ask user if they want to overwrite
@@ -21,54 +120,9 @@ def save_theme_file(theme_name, screen_controls, parent=None):
             QMessageBox.No
         )
         if reply != QMessageBox.Yes:
-            return False  # Cancel save
+            return None  # Cancel save
 
-    theme_data = {
-        "name": theme_name,
-        "screens": []
-    }
-
-    for sc in screen_controls:
-        if hasattr(sc, "frames") and sc.frames:
-            if len(sc.frames) > 1:
-                # Animated: save as GIF in memory
-                buf = io.BytesIO()
-                sc.frames[0].save(
-                    buf,
-                    format="GIF",
-                    save_all=True,
-                    append_images=sc.frames[1:],
-                    duration=getattr(sc, "speed", 100),
-                    loop=0,
-                    optimize=False
-                )
-                img_b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-                theme_data["screens"].append({
-                    "type": "gif",
-                    "data": img_b64
-                })
-            else:
-                # Static: save as PNG in memory
-                buf = io.BytesIO()
-                sc.frames[0].save(buf, format="PNG")
-                img_b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-                theme_data["screens"].append({
-                    "type": "png",
-                    "data": img_b64
-                })
-        else:
-            # Blank image
-            buf = io.BytesIO()
-            Image.new("RGB", (128, 128), color="black").save(buf, format="PNG")
-            img_b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-            theme_data["screens"].append({
-                "type": "png",
-                "data": img_b64
-            })
-
-    with open(theme_path, "w") as f:
-        json.dump(theme_data, f)
-    return True
+    return ThemeSaver(theme_path, theme_name, snapshot_screens(screen_controls), parent)
 
 class ScreensTab(QWidget):
     def __init__(self, parent=None):
@@ -83,9 +137,10 @@ class ScreensTab(QWidget):
         load_theme_btn.clicked.connect(self.load_theme)
         top_row.addWidget(load_theme_btn)
 
-        save_theme_btn = QPushButton("Save as Theme")
-        save_theme_btn.clicked.connect(self.save_as_theme)
-        top_row.addWidget(save_theme_btn)
+        self.save_theme_btn = QPushButton("Save as Theme")
+        self.save_theme_btn.clicked.connect(self.save_as_theme)
+        top_row.addWidget(self.save_theme_btn)
+        self._saver = None
 
         clear_all_btn = QPushButton("Clear All")
         clear_all_btn.clicked.connect(self.clear_all_screens)
@@ -121,14 +176,32 @@ class ScreensTab(QWidget):
         self.setLayout(outer_layout)
 
     def save_as_theme(self):
+        if self._saver is not None:
+            return
         name, ok = QInputDialog.getText(self, "Save Theme", "Theme Name:")
         if not ok or not name.strip():
             return
-        try:
-            save_theme_file(name.strip(), self.screen_controls, self)
-            QMessageBox.information(self, "Theme Saved", f"Theme '{name}' saved!")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
+        saver = save_theme_file(name.strip(), self.screen_controls, self)
+        if saver is None:
+            return
+        # Runs in the background; the screens stay usable meanwhile
+        progress = QProgressDialog(f"Saving theme '{name.strip()}'...", None, 0, 1, self)
+        progress.setWindowModality(Qt.NonModal)
+        progress.setMinimumDuration(300)
+        progress.setAutoClose(True)
+        saver.progress.connect(lambda done, total: (progress.setMaximum(total), progress.setValue(done)))
+        saver.saved.connect(lambda n: QMessageBox.information(self, "Theme Saved", f"Theme '{n}' saved!"))
+        saver.failed.connect(lambda err: QMessageBox.warning(self, "Error", err))
+        saver.finished.connect(progress.close)
+        saver.finished.connect(self._on_save_finished)
+        self._saver = saver
+        self.save_theme_btn.setEnabled(False)
+        saver.start()
+
+    def _on_save_finished(self):
+        self._saver.deleteLater()
+        self._saver = None
+        self.save_theme_btn.setEnabled(True)
 
     def clear_all_screens(self):
         for ctrl in self.screen_controls:
@@ -141,9 +214,11 @@ class ScreensTab(QWidget):
         if not theme_path:
             return
         try:
-            with open(theme_path, "r") as f:
-                theme_data = json.load(f)
-            for ctrl, screen in zip(self.screen_controls, theme_data["screens"]):
-                ctrl.load_from_theme_data(screen)
+            theme = read_theme(theme_path)
+            for ctrl, screen in zip(self.screen_controls, theme.screens):
+                if screen.legacy:
+                    ctrl.load_from_theme_data(screen.data)
+                else:
+                    ctrl.load_frames(screen.decode_frames(), screen.speed, stored=screen)
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load theme:\n{e}")
@@ -3,7 +3,7 @@
 import json, os
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QPushButton, QMessageBox, QComboBox, QGroupBox, QDateTimeEdit, QCheckBox
+    QLabel, QLineEdit, QPushButton, QMessageBox, QComboBox, QGroupBox, QDateTimeEdit, QCheckBox, QSpinBox
 )
 from PyQt5.QtCore import Qt, QDateTime
 from PyQt5.QtWidgets import QSlider
@@ -12,6 +12,10 @@ import datetime
 import toml
 
 from divoom_gaming_gate.utils.paths import SETTINGS_FILE
+from divoom_gaming_gate.utils.device import Command, get_client
+from divoom_gaming_gate.utils.batching import queue_command
+from divoom_gaming_gate.utils.device_state import get_mirror
+from divoom_gaming_gate.utils.frame_store import DEFAULT_BUDGET_MB
 
 from importlib.metadata import version, PackageNotFoundError
 
@@ -168,6 +172,18 @@ class SettingsTab(QWidget):
         hour_layout.addWidget(self.hour_mode_combo)
         layout.addLayout(hour_layout)
 
+        # RAM for loaded source frames; the rest spills to a scratch file
+        mem_layout = QHBoxLayout()
+        mem_layout.addWidget(QLabel("Frame Memory:"))
+        self.frame_mem_box = QSpinBox()
+        self.frame_mem_box.setRange(16, 8192)
+        self.frame_mem_box.setSingleStep(64)
+        self.frame_mem_box.setSuffix(" MB")
+        self.frame_mem_box.setValue(DEFAULT_BUDGET_MB)
+        self.frame_mem_box.setToolTip("Memory for loaded images across all screens. Applies to the next image loaded.")
+        mem_layout.addWidget(self.frame_mem_box)
+        layout.addLayout(mem_layout)
+
         # --- Tenor API Key input and link ---
         tenor_vlayout = QVBoxLayout()
         tenor_vlayout.setSpacing(0)  # Remove extra space between widgets
@@ -275,6 +291,8 @@ class SettingsTab(QWidget):
                 self.tz_combo.setCurrentText(city)
             self.dst_checkbox.setChecked(settings.get("dst", False))
             self.hour_mode_combo.setCurrentIndex(settings.get("hour_mode", 0))
+            self.bright_slider.setValue(settings.get("brightness", 100))
+            self.frame_mem_box.setValue(settings.get("frame_memory_mb", DEFAULT_BUDGET_MB))
             self.tenor_api_edit.setText(settings.get("tenor_api_key", ""))
             self.tenor_filter_combo.setCurrentText(settings.get("tenor_filter", "medium"))
             self.pixellab_api_edit.setText(settings.get("pixellab_api_key", ""))
@@ -290,39 +308,27 @@ class SettingsTab(QWidget):
             "timezone_city": self.tz_combo.currentText(),
             "dst": self.dst_checkbox.isChecked(),
             "hour_mode": self.hour_mode_combo.currentIndex(),
+            "brightness": self.bright_slider.value(),
+            "frame_memory_mb": self.frame_mem_box.value(),
             "tenor_api_key": self.tenor_api_edit.text().strip(),
             "tenor_filter": self.tenor_filter_combo.currentText(),
             "pixellab_api_key": self.pixellab_api_edit.text().strip()  # <-- Add this line
         }
         with open(SETTINGS_FILE, "w") as f:
             json.dump(settings, f, indent=2)
+        self.apply_device_settings()
         QMessageBox.information(self, "Settings", "Settings saved.")
 
     def set_brightness(self, value):
         if self.loading_settings:
             return
-        ip = self.ip_edit.text().strip()
-        if not ip:
-            return
-        payload = {
-            "Command": "Channel/SetBrightness",
-            "Brightness": value
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=4)
-        except Exception:
-            pass  # Silently ignore errors for now
+        queue_command(self.ip_edit.text(), Command.set_brightness(value))
 
-    def set_timezone(self):
-        if self.loading_settings:
-            return
-        ip = self.ip_edit.text().strip()
-        if not ip:
-            return
+    def timezone_value(self):
         city = self.tz_combo.currentText()
         tz_value = self.city_timezones.get(city)
         if not tz_value:
-            return
+            return None
 
         # Adjust for DST if checked
         if self.dst_checkbox.isChecked():
@@ -339,15 +345,23 @@ class SettingsTab(QWidget):
                     hours -= 1
                     tz_value = f"GMT-{hours}"
             # If GMT+0, becomes GMT+1; if GMT-1, becomes GMT-0, etc.
+        return tz_value
 
-        payload = {
-            "Command": "Sys/TimeZone",
-            "TimeZoneValue": tz_value
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=4)
-        except Exception:
-            pass  # Silently ignore errors for now
+    def set_timezone(self):
+        if self.loading_settings:
+            return
+        tz_value = self.timezone_value()
+        if tz_value:
+            queue_command(self.ip_edit.text(), Command.set_timezone(tz_value))
+
+    def apply_device_settings(self):
+        """Push the whole device profile; the batcher sends it as one CommandList."""
+        ip = self.ip_edit.text()
+        queue_command(ip, Command.set_brightness(self.bright_slider.value()))
+        tz_value = self.timezone_value()
+        if tz_value:
+            queue_command(ip, Command.set_timezone(tz_value))
+        queue_command(ip, Command.set_time24_flag(self.hour_mode_combo.currentIndex()))
 
     def sync_system_time(self):
         if self.loading_settings:
@@ -361,28 +375,14 @@ class SettingsTab(QWidget):
             if resp.ok:
                 data = resp.json()
                 utc_ts = int(data["unixtime"])
-                payload = {
-                    "Command": "Device/SetUTC",
-                    "Utc": utc_ts
-                }
-                requests.post(f"http://{ip}/post", json=payload, timeout=4)
+                queue_command(ip, Command.set_utc(utc_ts))
         except Exception:
             pass  # Silently ignore errors for now
 
     def set_hour_mode(self, index):
         if self.loading_settings:
             return
-        ip = self.ip_edit.text().strip()
-        if not ip:
-            return
-        payload = {
-            "Command": "Device/SetTime24Flag",
-            "Mode": index  # 0 for 12-hour, 1 for 24-hour
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=4)
-        except Exception:
-            pass  # Silently ignore errors for now
+        queue_command(self.ip_edit.text(), Command.set_time24_flag(index))  # 0 for 12-hour, 1 for 24-hour
 
     def get_current_version(self):
         try:
@@ -465,13 +465,13 @@ class SettingsTab(QWidget):
     def reboot_device(self):
         if self.loading_settings:
             return
-        ip = self.ip_edit.text().strip()
-        if not ip:
+        client = get_client(self.ip_edit.text())
+        if not client:
             QMessageBox.warning(self, "Reboot", "Please enter the device IP.")
             return
-        payload = {"Command": "Device/SysReboot"}
+        get_mirror().invalidate(client.ip)
         try:
-            resp = requests.post(f"http://{ip}/post", json=payload, timeout=5)
+            resp = client.reboot(timeout=5)
             if resp.ok:
                 QMessageBox.information(self, "Reboot", "Reboot command sent to device.")
             else:
@@ -486,11 +486,5 @@ class SettingsTab(QWidget):
         if not ip:
             QMessageBox.warning(self, "Screens", "Please enter the device IP.")
             return
-        payload = {
-            "Command": "Channel/OnOffScreen",
-            "OnOff": value  # 0 = Off, 1 = On
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=4)
-        except Exception as e:
-            QMessageBox.warning(self, "Screens", f"Error: {e}")
+        # 0 = Off, 1 = On
+        queue_command(ip, Command.on_off_screen(value), silent=False)
@@ -0,0 +1,309 @@
+# themes/catalog.py
+
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+from divoom_gaming_gate.utils.paths import THEMES_DIR, THEME_INDEX_FILE, PREVIEW_CACHE_DIR
+from divoom_gaming_gate.themes.theme_file import (
+    read_theme, make_preview_strip, collect_blobs, BinaryThemeFile
+)
+
+INDEX_VERSION   = 2
+RESCAN_DELAY_MS = 300    # let a save finish writing before we look at it
+INDEX_WORKERS   = 4      # mostly file I/O, which may be a network share
+PREVIEW_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def _cached_preview_path(fname, strip_type):
+    return os.path.join(PREVIEW_CACHE_DIR, f"{fname}.{strip_type}")
+
+
+def index_theme(path, stat):
+    """Catalog entry for the theme at ``path``.
+
+    Themes saved with an embedded preview strip are only read up to their
+    header. Older ones are decoded once to build a strip, which is kept in
+    PREVIEW_CACHE_DIR rather than in the index so the index stays small.
+    """
+    fname = os.path.basename(path)
+    theme = read_theme(path)
+    embedded = theme.header.get("preview")
+    if embedded:
+        preview = {"type": embedded["type"], "source": "embedded"}
+    else:
+        strip_type, strip = make_preview_strip([s.decode_frames() for s in theme.screens])
+        os.makedirs(PREVIEW_CACHE_DIR, exist_ok=True)
+        with open(_cached_preview_path(fname, strip_type), "wb") as f:
+            f.write(strip)
+        preview = {"type": strip_type, "source": "cache"}
+    return {
+        "file": fname,
+        "name": theme.name or os.path.splitext(fname)[0],
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "ctime": stat.st_ctime,
+        "preview": preview,
+    }
+
+
+def scan_themes(themes_dir, known):
+    """Files in ``themes_dir`` and the ones that need indexing, newest first.
+
+    ``known`` maps file name to its indexed ``(mtime, size)``. Runs on a
+    worker thread, so it only touches the filesystem.
+    """
+    seen = {}
+    for fname in os.listdir(themes_dir):
+        if not fname.endswith(".theme"):
+            continue
+        try:
+            seen[fname] = os.stat(os.path.join(themes_dir, fname))
+        except OSError:
+            continue
+    stale = [f for f, st in seen.items() if known.get(f) != (st.st_mtime, st.st_size)]
+    stale.sort(key=lambda f: seen[f].st_ctime, reverse=True)
+    return set(seen), [(f, seen[f]) for f in stale]
+
+
+class ThemeCatalog(QObject):
+    """Index of THEMES_DIR kept on disk and in sync with the folder.
+
+    Only files whose mtime or size changed since the last scan are parsed
+    again; a QFileSystemWatcher triggers a rescan when anything changes.
+    Scanning and parsing run on a small thread pool and entries are
+    reported one by one as they finish, so the cached index is usable
+    straight away. Preview strips are read on the same pool and kept in
+    an in-memory LRU; ``preview_ready`` says when one has arrived.
+    """
+
+    entry_updated = pyqtSignal(dict)   # added or changed
+    entry_removed = pyqtSignal(str)    # file name
+    scan_finished = pyqtSignal()
+    preview_ready = pyqtSignal(str)    # file name, see preview()
+
+    # Worker -> GUI thread hand-off
+    _scanned = pyqtSignal(object, object)           # seen names, [(fname, stat)]
+    _indexed = pyqtSignal(str, object, object)      # fname, entry or None, preview or None
+    _preview_loaded = pyqtSignal(str, object, object)   # fname, mtime, (type, bytes) or None
+
+    def __init__(self, themes_dir=THEMES_DIR, index_file=THEME_INDEX_FILE, parent=None):
+        super().__init__(parent)
+        self.themes_dir = themes_dir
+        self.index_file = index_file
+        self._entries = self._load_index()
+        self._pool = ThreadPoolExecutor(max_workers=INDEX_WORKERS, thread_name_prefix="theme-index")
+        self._scanning = False
+        self._rescan_pending = False
+        self._waiting = set()    # files handed to the pool this scan
+        self._changed = False
+        self._previews = OrderedDict()   # fname -> (mtime, type, bytes)
+        self._preview_bytes = 0
+        self._preview_pending = set()    # (fname, mtime) being read
+        self._preview_failed = set()     # (fname, mtime), retried after the next scan
+        self._scanned.connect(self._on_scanned)
+        self._indexed.connect(self._on_indexed)
+        self._preview_loaded.connect(self._on_preview_loaded)
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(RESCAN_DELAY_MS)
+        self._rescan_timer.timeout.connect(self.refresh)
+        self._watcher = QFileSystemWatcher([themes_dir], self)
+        self._watcher.directoryChanged.connect(self._schedule_rescan)
+        self._watcher.fileChanged.connect(self._schedule_rescan)
+
+    def _load_index(self):
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, "r") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    return data.get("themes", {})
+            except Exception:
+                pass
+        return {}
+
+    def _save_index(self):
+        tmp = self.index_file + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"version": INDEX_VERSION, "themes": self._entries}, f)
+            os.replace(tmp, self.index_file)
+        except Exception as e:
+            print(f"Failed to save theme index: {e}")
+
+    def _schedule_rescan(self, *_):
+        self._rescan_timer.start()
+
+    def entries(self):
+        """All known themes, oldest first."""
+        return sorted(self._entries.values(), key=lambda e: (e["ctime"], e["file"]))
+
+    def entry(self, fname):
+        return self._entries.get(fname)
+
+    def path(self, fname):
+        return os.path.join(self.themes_dir, fname)
+
+    def load(self, fname):
+        return read_theme(self.path(fname))
+
+    def preview(self, entry):
+        """Cached ``(type, bytes)`` preview strip for ``entry``, or None while
+        it is being read in the background (``preview_ready`` follows) or if
+        it couldn't be read."""
+        fname, mtime = entry["file"], entry["mtime"]
+        cached = self._previews.get(fname)
+        if cached and cached[0] == mtime:
+            self._previews.move_to_end(fname)
+            return cached[1], cached[2]
+        key = (fname, mtime)
+        if key not in self._preview_pending and key not in self._preview_failed:
+            self._preview_pending.add(key)
+            self._pool.submit(self._read_preview, dict(entry))
+        return None
+
+    def _read_preview(self, entry):
+        try:
+            data = self.preview_data(entry)
+        except Exception as e:
+            print(f"Failed to read preview for {entry['file']}: {e}")
+            data = None
+        self._preview_loaded.emit(entry["file"], entry["mtime"], data)
+
+    def _on_preview_loaded(self, fname, mtime, data):
+        self._preview_pending.discard((fname, mtime))
+        if data is None or data[1] is None:
+            self._preview_failed.add((fname, mtime))
+        else:
+            self._cache_preview(fname, mtime, data)
+        self.preview_ready.emit(fname)
+
+    def _cache_preview(self, fname, mtime, data):
+        self._forget_preview(fname)
+        self._previews[fname] = (mtime, data[0], data[1])
+        self._preview_bytes += len(data[1])
+        while self._preview_bytes > PREVIEW_CACHE_BYTES and len(self._previews) > 1:
+            _, (_, _, old) = self._previews.popitem(last=False)
+            self._preview_bytes -= len(old)
+
+    def _forget_preview(self, fname):
+        cached = self._previews.pop(fname, None)
+        if cached:
+            self._preview_bytes -= len(cached[2])
+
+    def preview_data(self, entry):
+        """``(type, bytes)`` of a theme's preview strip, reading nothing else."""
+        preview = entry["preview"]
+        if preview["source"] == "embedded":
+            return preview["type"], BinaryThemeFile(self.path(entry["file"])).read_preview()
+        with open(_cached_preview_path(entry["file"], preview["type"]), "rb") as f:
+            return preview["type"], f.read()
+
+    def _drop_cached_preview(self, entry):
+        if entry["preview"]["source"] == "cache":
+            try:
+                os.remove(_cached_preview_path(entry["file"], entry["preview"]["type"]))
+            except OSError:
+                pass
+
+    def is_scanning(self):
+        return self._scanning
+
+    def refresh(self):
+        """Start re-indexing added or changed themes and dropping removed ones.
+
+        Returns immediately; results arrive through ``entry_updated`` and
+        ``entry_removed``, then ``scan_finished``.
+        """
+        self._rescan_timer.stop()
+        if self._scanning:
+            self._rescan_pending = True
+            return
+        self._scanning = True
+        self._changed = False
+        self._preview_failed.clear()
+        known = {f: (e["mtime"], e["size"]) for f, e in self._entries.items()}
+        self._pool.submit(self._scan, known)
+
+    def _scan(self, known):
+        try:
+            seen, stale = scan_themes(self.themes_dir, known)
+        except OSError as e:
+            print(f"Failed to scan themes in {self.themes_dir}: {e}")
+            seen, stale = set(self._entries), []
+        self._scanned.emit(seen, stale)
+
+    def _index(self, fname, stat):
+        path = self.path(fname)
+        preview = None
+        try:
+            entry = index_theme(path, stat)
+            # Read the strip while we're here so the card doesn't have to
+            preview = self.preview_data(entry)
+        except Exception as e:
+            print(f"Failed to load theme {path}: {e}")
+            entry = None
+        self._indexed.emit(fname, entry, preview)
+
+    def _collect_blobs(self):
+        try:
+            collect_blobs(self.themes_dir)
+        except Exception as e:
+            print(f"Failed to collect unused theme frames: {e}")
+
+    def _on_scanned(self, seen, stale):
+        for fname in [f for f in self._entries if f not in seen]:
+            self._drop_cached_preview(self._entries.pop(fname))
+            self._forget_preview(fname)
+            self._changed = True
+            self.entry_removed.emit(fname)
+        # Files replaced on save drop out of the watch list; put them back
+        watched = set(self._watcher.files())
+        missing = [self.path(f) for f in seen if self.path(f) not in watched]
+        if missing:
+            self._watcher.addPaths(missing)
+        self._waiting = {fname for fname, _ in stale}
+        for fname, stat in stale:   # newest first
+            self._pool.submit(self._index, fname, stat)
+        if not stale:
+            self._finish_scan()
+
+    def _on_indexed(self, fname, entry, preview):
+        self._waiting.discard(fname)
+        if entry is not None:
+            if preview is not None and preview[1] is not None:
+                self._cache_preview(fname, entry["mtime"], preview)
+            old = self._entries.get(fname)
+            if old and old["preview"] != entry["preview"]:
+                self._drop_cached_preview(old)
+            self._entries[fname] = entry
+            self._changed = True
+            self.entry_updated.emit(entry)
+        if not self._waiting:
+            self._finish_scan()
+
+    def _finish_scan(self):
+        if self._changed:
+            self._save_index()
+            # Themes were added, replaced or removed (in the app or not);
+            # drop frames none of the remaining ones use
+            self._pool.submit(self._collect_blobs)
+        self._scanning = False
+        self.scan_finished.emit()
+        if self._rescan_pending:
+            self._rescan_pending = False
+            self.refresh()
+
+
+_catalog = None
+
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = ThemeCatalog()
+    return _catalog
@@ -0,0 +1,309 @@
+# themes/theme_file.py
+#
+# Theme files come in two flavours:
+#
+#  * legacy: JSON {"name", "screens": [{"type": "gif"|"png", "data": <base64>}]}
+#  * binary: the device-ready container below, which stores every frame as
+#    the JPEG that gets sent, so sending a theme is file I/O plus HTTP.
+#
+# Binary layout (little endian):
+#
+#   MAGIC (8) | version u16 | reserved u16 | header length u32 | header JSON | data
+#
+# The header lists, per screen, speed, quality, a content digest and
+# "blobs", the keys of its JPEG frames in the shared blob store
+# (utils/blob_store.py), so frames used by several themes are kept on disk
+# once. The data section only holds the preview strip. These headers are
+# also what the store's garbage collection counts references from
+# (collect_blobs).
+
+import base64
+import hashlib
+import io
+import json
+import os
+import struct
+from collections import Counter
+
+from PIL import Image, ImageSequence
+
+from divoom_gaming_gate.utils.encoding import encode_jpeg, BudgetEncoder, DEFAULT_QUALITY
+from divoom_gaming_gate.utils.device_state import data_digest
+from divoom_gaming_gate.utils.blob_store import get_blob_store
+from divoom_gaming_gate.utils.paths import THEMES_DIR
+from divoom_gaming_gate.utils.payload_cache import frame_digest
+
+MAGIC          = b"DGGTHEME"
+FORMAT_VERSION = 2
+PREFIX         = struct.Struct("<8sHHI")
+DEFAULT_SPEED  = 100
+IMG_SIZE       = 128
+SCREEN_COUNT   = 5
+
+PREVIEW_SIZE       = 64     # px per screen in the card preview strip
+PREVIEW_GAP        = 4
+PREVIEW_MAX_FRAMES = 24
+PREVIEW_SPEED      = 100
+PREVIEW_BG         = (35, 35, 35)
+
+
+class ThemeFormatError(Exception):
+    pass
+
+
+def decode_theme_screen(screen):
+    """Decode one legacy theme screen entry into a list of RGB frames."""
+    img_data = base64.b64decode(screen["data"])
+    if screen["type"] == "gif":
+        img = Image.open(io.BytesIO(img_data))
+        return [fr.convert("RGB") for fr in ImageSequence.Iterator(img)]
+    return [Image.open(io.BytesIO(img_data)).convert("RGB")]
+
+
+def make_preview_strip(screen_frames, size=PREVIEW_SIZE, max_frames=PREVIEW_MAX_FRAMES):
+    """All screens side by side at ``size`` px, as one small GIF (or PNG if static).
+
+    ``screen_frames`` is a list of frame lists, one per screen. Longer
+    animations are sampled down to ``max_frames``. Returns ``(type, bytes)``.
+    """
+    count = max(1, min(max_frames, max(len(frames) for frames in screen_frames)))
+    width = len(screen_frames) * size + (len(screen_frames) - 1) * PREVIEW_GAP
+    blank = Image.new("RGB", (size, size), "black")   # what a blank screen shows
+    tiles = []
+    for frames in screen_frames:
+        if frames:
+            picks = [frames[int(k * len(frames) / count)] for k in range(count)]
+            tiles.append([f.resize((size, size), Image.LANCZOS) for f in picks])
+        else:
+            tiles.append([blank] * count)
+    strip = []
+    for k in range(count):
+        canvas = Image.new("RGB", (width, size), PREVIEW_BG)
+        for i, tile in enumerate(tiles):
+            canvas.paste(tile[k], (i * (size + PREVIEW_GAP), 0))
+        strip.append(canvas)
+    buf = io.BytesIO()
+    if len(strip) > 1:
+        strip[0].save(buf, format="GIF", save_all=True, append_images=strip[1:],
+                      duration=PREVIEW_SPEED, loop=0)
+        return "gif", buf.getvalue()
+    strip[0].save(buf, format="PNG")
+    return "png", buf.getvalue()
+
+
+def jpeg_digest(jpegs, speed, quality):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{speed}:{quality}:{len(jpegs)}".encode())
+    for data in jpegs:
+        h.update(hashlib.blake2b(data, digest_size=16).digest())
+    return h.hexdigest()
+
+
+def source_digest(frames, speed, encoding):
+    """Hash of what a screen is saved from: its frames, speed and encoding
+    settings (a quality or ``BudgetEncoder.describe()``). Stored per screen
+    so a re-save can tell which screens need encoding again."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{speed}:{encoding}:{len(frames)}".encode())
+    for frame in frames:
+        h.update(frame_digest(frame))
+    return h.hexdigest()
+
+
+def encoding_key(quality, budget):
+    """The ``encoding`` part of ``source_digest`` for a quality or a
+    GifJob byte-budget dict (empty = use quality)."""
+    return BudgetEncoder(**budget).describe() if budget else quality
+
+
+class ThemeScreen:
+    """One screen of a theme, whichever format it came from."""
+
+    legacy = False
+
+    def __init__(self, speed, quality, digest):
+        self.speed = speed
+        self.quality = quality
+        self.digest = digest
+
+    def jpeg_frames(self):
+        """Device-ready JPEG frames, or None if they have to be encoded."""
+        return None
+
+    def decode_frames(self):
+        raise NotImplementedError
+
+
+class LegacyScreen(ThemeScreen):
+    legacy = True
+
+    def __init__(self, data):
+        super().__init__(DEFAULT_SPEED, DEFAULT_QUALITY,
+                         data_digest(data["data"], DEFAULT_SPEED, DEFAULT_QUALITY))
+        self.data = data
+
+    def decode_frames(self):
+        return decode_theme_screen(self.data)
+
+
+class BinaryScreen(ThemeScreen):
+    def __init__(self, theme_file, entry):
+        super().__init__(entry["speed"], entry["quality"], entry["digest"])
+        self.theme_file = theme_file
+        self.entry = entry
+        self.blobs = entry["blobs"]
+
+    def jpeg_frames(self):
+        return self.theme_file.store.get_many(self.blobs)
+
+    def decode_frames(self):
+        return [Image.open(io.BytesIO(data)).convert("RGB") for data in self.jpeg_frames()]
+
+
+class Theme:
+    def __init__(self, name, screens, path=None, header=None):
+        self.name = name
+        self.screens = screens
+        self.path = path
+        self.header = header or {}
+
+
+class BinaryThemeFile:
+    """Reader for the binary container. The file is only held open while
+    its header or preview strip is read, so it can be replaced or deleted
+    at any other time."""
+
+    def __init__(self, path, store=None):
+        self.path = path
+        self.store = store or get_blob_store()
+        with open(path, "rb") as f:
+            prefix = f.read(PREFIX.size)
+            if len(prefix) < PREFIX.size:
+                raise ThemeFormatError("truncated theme file")
+            magic, version, _, header_len = PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise ThemeFormatError("not a binary theme file")
+            if version > FORMAT_VERSION:
+                raise ThemeFormatError(f"theme format {version} is newer than this app supports")
+            if version < FORMAT_VERSION:
+                raise ThemeFormatError(f"theme format {version} is no longer supported")
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+        self.data_offset = PREFIX.size + header_len
+
+    def read_preview(self):
+        """Bytes of the embedded preview strip, or None for files without one."""
+        preview = self.header.get("preview")
+        if not preview:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(self.data_offset + preview["offset"])
+            return f.read(preview["length"])
+
+    def theme(self):
+        screens = [BinaryScreen(self, entry) for entry in self.header["screens"]]
+        return Theme(self.header.get("name", ""), screens, self.path, self.header)
+
+
+def is_binary_theme(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_theme(path, store=None):
+    """Load a theme in either format."""
+    if is_binary_theme(path):
+        return BinaryThemeFile(path, store).theme()
+    with open(path, "r") as f:
+        data = json.load(f)
+    return Theme(data.get("name", ""), [LegacyScreen(s) for s in data["screens"]], path)
+
+
+def encode_screen(frames, quality=DEFAULT_QUALITY, frame_bytes=None, total_bytes=None):
+    """JPEG-encode a screen's frames the way GifJob would send them."""
+    if frame_bytes or total_bytes:
+        budget = BudgetEncoder(frame_bytes, total_bytes)
+        return [budget.encode(frames, i) for i in range(len(frames))]
+    return [encode_jpeg(frame, quality) for frame in frames]
+
+
+def blank_screen():
+    return [encode_jpeg(Image.new("RGB", (IMG_SIZE, IMG_SIZE), "black"), DEFAULT_QUALITY)]
+
+
+def write_theme(path, name, screens, preview=None, extra=None, store=None):
+    """Write a binary theme atomically.
+
+    ``screens`` is a list of ``(jpeg_frames, speed, quality[, source])``;
+    ``quality`` is only recorded (it is part of the content digest) and
+    ``source`` is an optional ``source_digest`` to record. An item may instead be
+    a screen entry from the header of the theme being replaced,
+    which is kept as is without touching its frames. ``preview`` is an
+    optional ``(type, bytes)`` strip from ``make_preview_strip``. Frames go
+    to the blob store and stay pinned until the file is in place.
+    """
+    store = store or get_blob_store()
+    header = {"name": name, "screens": []}
+    if extra:
+        header.update(extra)
+    data = b""
+    if preview:
+        header["preview"] = {"type": preview[0], "offset": 0, "length": len(preview[1])}
+        data = preview[1]
+    pinned = []
+    try:
+        for screen in screens:
+            if isinstance(screen, dict):
+                store.pin(screen["blobs"])
+                pinned.extend(screen["blobs"])
+                header["screens"].append(screen)
+                continue
+            jpegs, speed, quality = screen[:3]
+            blobs = store.put(jpegs)
+            pinned.extend(blobs)
+            entry = {
+                "speed": speed, "quality": quality, "width": IMG_SIZE,
+                "digest": jpeg_digest(jpegs, speed, quality), "blobs": blobs,
+            }
+            if len(screen) > 3:
+                entry["source"] = screen[3]
+            header["screens"].append(entry)
+        header_bytes = json.dumps(header).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        store.unpin(pinned)
+
+
+def theme_blob_refs(themes_dir=THEMES_DIR):
+    """Counter of blob keys used by the theme files in ``themes_dir``, or None
+    if any of them can't be read (it might use blobs we'd otherwise delete)."""
+    refs = Counter()
+    try:
+        names = [f for f in os.listdir(themes_dir) if f.endswith(".theme")]
+    except OSError:
+        return None
+    for fname in names:
+        path = os.path.join(themes_dir, fname)
+        try:
+            if not is_binary_theme(path):
+                continue
+            header = BinaryThemeFile(path).header
+        except FileNotFoundError:
+            continue   # removed since listdir
+        except Exception as e:
+            print(f"Not collecting blobs, can't read {path}: {e}")
+            return None
+        keys = set()
+        for screen in header.get("screens", ()):
+            keys.update(screen.get("blobs", ()))
+        refs.update(keys)
+    return refs
+
+
+def collect_blobs(themes_dir=THEMES_DIR, store=None):
+    """Delete blobs no theme in ``themes_dir`` uses any more."""
+    return (store or get_blob_store()).collect(lambda: theme_blob_refs(themes_dir))
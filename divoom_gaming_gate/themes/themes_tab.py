@@ -1,68 +1,286 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QToolButton, QPushButton, QFrame, QMessageBox, QScrollArea
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap, QMovie, QIcon
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QToolButton, QPushButton, QFrame, QMessageBox, QScrollArea
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QByteArray, QBuffer, QIODevice
+from PyQt5.QtGui import QPixmap, QMovie
 import os
-import json
-import base64
-import tempfile
-import requests
-import io
-import time
-from PIL import Image, ImageSequence
 
 from divoom_gaming_gate.utils.paths import THEMES_DIR
+from divoom_gaming_gate.utils.send_queue import get_send_queue, GifJob, JpegGifJob, lcd_array_for, force_requested
+from divoom_gaming_gate.utils.preview_clock import get_preview_clock
+from divoom_gaming_gate.themes.theme_file import PREVIEW_SIZE, PREVIEW_GAP, SCREEN_COUNT
+from divoom_gaming_gate.themes.catalog import get_catalog
+
+CARD_WIDTH = 400
 
 class AnimatedLabel(QLabel):
-    """A QLabel that can show a static image or an animated GIF from bytes."""
-    def set_image(self, img_type, b64data, size):
-        data = base64.b64decode(b64data)
+    """A QLabel that can show a static image or an animated GIF from bytes.
+
+    GIFs are stepped by the shared preview clock rather than QMovie's own
+    timer, and only while ``play()`` is in effect.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.movie = None
+        self._buffer = None
+        self._bytes = None
+
+    def set_image(self, img_type, data, size):
+        self.release_image()
         if img_type == "gif":
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".gif")
-            tmp.write(data)
-            tmp.close()
-            self.movie = QMovie(tmp.name)
+            # Played straight from memory; the label owns the bytes and the
+            # buffer until the next set_image or release_image
+            self._bytes = QByteArray(data)
+            self._buffer = QBuffer(self._bytes, self)
+            self._buffer.open(QIODevice.ReadOnly)
+            self.movie = QMovie(self._buffer, b"gif", self)
+            self.movie.setCacheMode(QMovie.CacheAll)
             self.movie.setScaledSize(size)
             self.setMovie(self.movie)
-            self.movie.start()
-            self._tmpfile = tmp.name
+            self.movie.jumpToFrame(0)
         else:
             pixmap = QPixmap()
             pixmap.loadFromData(data)
             pixmap = pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
             self.setPixmap(pixmap)
-            self.movie = None
-            self._tmpfile = None
 
-    def leaveEvent(self, event):
-        if hasattr(self, "movie") and self.movie:
+    def release_image(self):
+        self.pause()
+        self.clear()
+        if self.movie is not None:
             self.movie.stop()
+            self.movie.deleteLater()
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer.deleteLater()
+        self.movie = None
+        self._buffer = None
+        self._bytes = None
+
+    def play(self):
+        if self.movie is not None and self.movie.frameCount() != 1:
+            get_preview_clock().start(self, self._frame_delay, self._next_frame)
+
+    def pause(self):
+        get_preview_clock().stop(self)
+
+    def _frame_delay(self):
+        return self.movie.nextFrameDelay()
+
+    def _next_frame(self):
+        if not self.movie.jumpToNextFrame():
+            self.movie.jumpToFrame(0)
+
+    def leaveEvent(self, event):
+        self.pause()
         super().leaveEvent(event)
 
     def cleanup(self):
-        if hasattr(self, "_tmpfile") and self._tmpfile:
-            try:
-                os.remove(self._tmpfile)
-            except Exception:
-                pass
-
-class ThemeWidget(QWidget):
-    def __init__(self, theme, preview_labels, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.theme = theme
-        self.preview_labels = preview_labels
+        self.release_image()
+
+class ThemeCard(QWidget):
+    """One theme in the grid. Cards are recycled: ``bind`` points an existing
+    card at a different catalog entry instead of building a new one."""
+
+    send_requested   = pyqtSignal(str)   # theme file name
+    delete_requested = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fname = None
+        self.entry = None
+        self.preview_key = None
+
+        # --- Theme frame (box) ---
+        theme_frame = QFrame()
+        theme_frame.setFrameShape(QFrame.Box)
+        theme_frame.setLineWidth(2)
+        theme_frame.setStyleSheet("""
+            QFrame {
+                border: none;
+                border-radius: 12px;
+                background: #232323;
+            }
+        """)
+        theme_vbox = QVBoxLayout(theme_frame)
+        theme_vbox.setSpacing(4)
+        theme_vbox.setContentsMargins(8, 8, 8, 8)
+
+        # Top row: send (left), name (center), delete (right)
+        top_row = QHBoxLayout()
+        send_btn = QToolButton()
+        send_btn.setText('Send to Screens 📤')
+        send_btn.setToolTip("Send to Screens (Shift+click to re-send unchanged screens too)")
+        send_btn.clicked.connect(lambda: self.send_requested.emit(self.fname))
+        top_row.addWidget(send_btn, alignment=Qt.AlignLeft)
+
+        top_row.addStretch()
+        self.name_label = QLabel()
+        self.name_label.setAlignment(Qt.AlignHCenter)
+        self.name_label.setStyleSheet("""
+            font-weight: bold;
+            font-size: 14px;
+            color: #eee;
+            background: transparent;
+            border: none;
+        """)
+        top_row.addWidget(self.name_label, alignment=Qt.AlignHCenter)
+        top_row.addStretch()
+
+        del_btn = QPushButton("Delete Theme")
+        del_btn.clicked.connect(lambda: self.delete_requested.emit(self.fname))
+        top_row.addWidget(del_btn, alignment=Qt.AlignRight)
+
+        theme_vbox.addLayout(top_row)
+
+        # Preview strip: all five screens in one small image
+        self.preview = AnimatedLabel()
+        self.preview.setFixedSize(SCREEN_COUNT * PREVIEW_SIZE + (SCREEN_COUNT - 1) * PREVIEW_GAP, PREVIEW_SIZE)
+        theme_vbox.addWidget(self.preview, alignment=Qt.AlignCenter)
+
+        theme_frame.setFixedWidth(CARD_WIDTH)
+
+        self.setObjectName("themeCard")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setStyleSheet("""
+            #themeCard {
+                border: 1px solid #aaa;
+                border-radius: 12px;
+                background: transparent;
+            }
+            #themeCard:hover {
+                border: 1.5px solid #fff;
+                background: #282828;
+            }
+        """)
+        theme_layout = QVBoxLayout(self)
+        theme_layout.setContentsMargins(0, 0, 0, 0)
+        theme_layout.setSpacing(0)
+        theme_layout.addWidget(theme_frame)
+
+    def bind(self, entry):
+        self.entry = entry
+        self.fname = entry["file"]
+        self.name_label.setText(entry["name"])
+        key = (entry["file"], entry["mtime"])
+        if key == self.preview_key:
+            return
+        # Strips are read on the catalog's pool; until this one is in
+        # memory the card shows nothing rather than the theme it had before
+        preview = get_catalog().preview(entry)
+        if preview is None:
+            self.preview.release_image()
+            self.preview_key = None
+            return
+        try:
+            self.preview.set_image(preview[0], preview[1], self.preview.size())  # paused until hovered
+        except Exception as e:
+            print(f"Failed to show preview for {entry['file']}: {e}")
+            self.preview.release_image()
+            self.preview_key = None
+            return
+        self.preview_key = key
+
+    def release(self):
+        self.preview.pause()
+        self.hide()
 
     def enterEvent(self, event):
-        for label in self.preview_labels:
-            if hasattr(label, "movie") and label.movie:
-                label.movie.start()
+        self.preview.play()
         super().enterEvent(event)
 
     def leaveEvent(self, event):
-        for label in self.preview_labels:
-            if hasattr(label, "movie") and label.movie:
-                label.movie.stop()
+        self.preview.pause()
         super().leaveEvent(event)
 
+
+class ThemeGrid(QScrollArea):
+    """Scrollable grid of theme cards that only keeps cards for the rows in
+    view (plus one either side); scrolled-out cards are reused."""
+
+    send_requested   = pyqtSignal(str)
+    delete_requested = pyqtSignal(str)
+
+    COLUMNS  = 3
+    SPACING  = 12
+    OVERSCAN = 1   # rows
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWidgetResizable(True)
+        self.setFrameShape(QFrame.NoFrame)
+        self.container = QWidget()
+        self.setWidget(self.container)
+        self.entries = []
+        self.live = {}    # entry index -> card
+        self.spare = []
+        self._card_size = None
+        self.verticalScrollBar().valueChanged.connect(self._update_visible)
+        get_catalog().preview_ready.connect(self._on_preview_ready)
+
+    def _on_preview_ready(self, fname):
+        for card in self.live.values():
+            if card.fname == fname and card.entry is not None:
+                card.bind(card.entry)
+
+    def set_entries(self, entries):
+        self.entries = list(entries)
+        for card in self.live.values():
+            card.release()
+            self.spare.append(card)
+        self.live = {}
+        self._update_visible()
+
+    def _new_card(self, fname=None):
+        # Prefer the card that last showed this theme so its preview is reused
+        for i, card in enumerate(self.spare):
+            if fname is not None and card.fname == fname:
+                return self.spare.pop(i)
+        if self.spare:
+            return self.spare.pop()
+        card = ThemeCard(self.container)
+        card.hide()
+        card.send_requested.connect(self.send_requested)
+        card.delete_requested.connect(self.delete_requested)
+        return card
+
+    def card_size(self):
+        if self._card_size is None:
+            probe = self._new_card()
+            self._card_size = probe.sizeHint()
+            self.spare.append(probe)
+        return self._card_size
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.set_entries(self.entries)
+
+    def _update_visible(self, *_):
+        size = self.card_size()
+        row_h = size.height() + self.SPACING
+        col_w = size.width() + self.SPACING
+        rows = (len(self.entries) + self.COLUMNS - 1) // self.COLUMNS
+        # Cards are placed by hand, so size the container like a grid layout would
+        self.container.setMinimumSize(self.COLUMNS * col_w - self.SPACING, rows * row_h)
+
+        top = self.verticalScrollBar().value()
+        first = max(0, top // row_h - self.OVERSCAN)
+        last = min(rows - 1, (top + self.viewport().height()) // row_h + self.OVERSCAN)
+        wanted = set(range(first * self.COLUMNS, min(len(self.entries), (last + 1) * self.COLUMNS)))
+
+        for index in [i for i in self.live if i not in wanted]:
+            card = self.live.pop(index)
+            card.release()
+            self.spare.append(card)
+        for index in sorted(wanted):
+            if index in self.live:
+                continue   # already placed
+            entry = self.entries[index]
+            card = self.live[index] = self._new_card(entry["file"])
+            card.bind(entry)
+            row, col = divmod(index, self.COLUMNS)
+            card.setGeometry(col * col_w, row * row_h, size.width(), size.height())
+            card.show()
+
+
 class ThemesTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -71,20 +289,21 @@ class ThemesTab(QWidget):
         main_layout.setContentsMargins(8, 8, 8, 8)
         main_layout.setSpacing(8)
 
-        # --- Add scroll area ---
-        self.scroll_area = QScrollArea(self)
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setFrameShape(QFrame.NoFrame)
-
-        # Container widget for the grid
-        self.grid_container = QWidget()
-        self.themes_grid = QGridLayout(self.grid_container)
-        self.themes_grid.setSpacing(12)
-        self.grid_container.setLayout(self.themes_grid)
-
-        self.scroll_area.setWidget(self.grid_container)
-        main_layout.addWidget(self.scroll_area)  # Only this, no addStretch()
-
+        # Only cards in view exist as widgets; see ThemeGrid
+        self.grid = ThemeGrid(self)
+        self.grid.send_requested.connect(self.send_theme_file)
+        self.grid.delete_requested.connect(self.delete_theme)
+        main_layout.addWidget(self.grid)
+
+        # Cards come from the catalog index straight away; changed themes are
+        # re-read in the background and show up as each one finishes
+        self.catalog = get_catalog()
+        self._regrid_timer = QTimer(self)
+        self._regrid_timer.setSingleShot(True)
+        self._regrid_timer.timeout.connect(lambda: self.grid.set_entries(self.catalog.entries()))
+        self.catalog.entry_updated.connect(self._on_catalog_changed)
+        self.catalog.entry_removed.connect(self._on_catalog_changed)
+        self.grid.set_entries(self.catalog.entries())
         self.refresh_themes()
 
     def showEvent(self, event):
@@ -92,182 +311,49 @@ class ThemesTab(QWidget):
         self.refresh_themes()
 
     def refresh_themes(self):
-        # Clear old widgets
-        while self.themes_grid.count():
-            item = self.themes_grid.takeAt(0)
-            widget = item.widget()
-            if widget:
-                if hasattr(widget, "cleanup"):
-                    widget.cleanup()
-                widget.deleteLater()
-
-        # Sort theme files by creation time (oldest first)
-        theme_files = [
-            os.path.join(THEMES_DIR, fname)
-            for fname in os.listdir(THEMES_DIR)
-            if fname.endswith(".theme")
-        ]
-        theme_files.sort(key=lambda f: os.path.getctime(f))
-
-        themes = []
-        for path in theme_files:
-            with open(path, "r") as f:
-                try:
-                    data = json.load(f)
-                    data["__file"] = os.path.basename(path)
-                    themes.append(data)
-                except Exception as e:
-                    print(f"Failed to load theme {path}: {e}")
-
-        col_count = 3
-        for idx, theme in enumerate(themes):
-            col = idx % col_count
-            row = idx // col_count
-
-            # --- Theme frame (box) ---
-            theme_frame = QFrame()
-            theme_frame.setFrameShape(QFrame.Box)
-            theme_frame.setLineWidth(2)
-            theme_frame.setStyleSheet("""
-                QFrame {
-                    border: none;
-                    border-radius: 12px;
-                    background: #232323;
-                }
-            """)
-            theme_vbox = QVBoxLayout(theme_frame)
-            theme_vbox.setSpacing(4)
-            theme_vbox.setContentsMargins(8, 8, 8, 8)
-
-            # Top row: send (left), name (center), delete (right)
-            top_row = QHBoxLayout()
-            send_btn = QToolButton()
-            send_btn.setText('Send to Screens 📤')
-            send_btn.setToolTip("Send to Screens")
-            send_btn.clicked.connect(lambda _, t=theme: self.send_theme(t))
-            top_row.addWidget(send_btn, alignment=Qt.AlignLeft)
-
-            top_row.addStretch()
-            name_label = QLabel(theme["name"])
-            name_label.setAlignment(Qt.AlignHCenter)
-            name_label.setStyleSheet("""
-                font-weight: bold;
-                font-size: 14px;
-                color: #eee;
-                background: transparent;
-                border: none;
-            """)
-            top_row.addWidget(name_label, alignment=Qt.AlignHCenter)
-            top_row.addStretch()
-
-            del_btn = QPushButton("Delete Theme")
-            del_btn.clicked.connect(lambda _, f=theme["__file"]: self.delete_theme(f))
-            top_row.addWidget(del_btn, alignment=Qt.AlignRight)
-
-            theme_vbox.addLayout(top_row)
-
-            # Previews row
-            previews_row = QHBoxLayout()
-            previews_row.setSpacing(4)
-            preview_labels = []
-            for screen in theme["screens"]:
-                frame = QFrame()
-                frame.setFrameShape(QFrame.Box)
-                frame.setLineWidth(1)
-                frame.setStyleSheet("QFrame { border: 1px solid #555; border-radius: 4px; background: #232323; }")
-                frame_layout = QVBoxLayout(frame)
-                frame_layout.setContentsMargins(2, 2, 2, 2)
-                label = AnimatedLabel()
-                label.setFixedSize(64, 64)
-                label.set_image(screen["type"], screen["data"], label.size())
-                label.leaveEvent(None)  # Stop animation by default
-                preview_labels.append(label)
-                frame_layout.addWidget(label, alignment=Qt.AlignCenter)
-                previews_row.addWidget(frame)
-            theme_vbox.addLayout(previews_row)
-
-            theme_frame.setFixedWidth(400)
-
-            # --- Wrap in ThemeWidget for hover effect ---
-            theme_widget = ThemeWidget(theme, preview_labels)
-            theme_widget.setObjectName("themeCard")
-            theme_widget.setStyleSheet("""
-                #themeCard {
-                    border: 1px solid #aaa;
-                    border-radius: 12px;
-                    background: transparent;
-                }
-                #themeCard:hover {
-                    border: 1.5px solid #fff;
-                    background: #282828;
-                }
-            """)
-            theme_layout = QVBoxLayout(theme_widget)
-            theme_layout.setContentsMargins(0, 0, 0, 0)
-            theme_layout.setSpacing(0)
-            theme_layout.addWidget(theme_frame)
-
-            self.themes_grid.addWidget(theme_widget, row, col, alignment=Qt.AlignTop | Qt.AlignHCenter)
-
-        self.themes_grid.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        # Non-blocking: only themes whose file changed get parsed again
+        self.catalog.refresh()
+
+    def _on_catalog_changed(self, *_):
+        # Entries arrive in bursts; lay the grid out once per event loop pass
+        self._regrid_timer.start(0)
+
+    def send_theme_file(self, fname):
+        # The file may have changed or gone since the last rescan
+        try:
+            theme = self.catalog.load(fname)
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Failed to load theme:\n{e}")
+            self.refresh_themes()
+            return
+        self.send_theme(theme)
 
     def send_theme(self, theme):
         from divoom_gaming_gate.utils.config import Config
-        import requests, io, base64, time
-        from PIL import Image, ImageSequence
-
-        # These should match your screen_control.py constants
-        SCREEN_COUNT = 5
-        IMG_SIZE = 128
-        DEFAULT_SPEED = 100
-        DEFAULT_QUALITY = 85
 
         DEVICE_IP = Config.get_device_ip()
         if not DEVICE_IP or DEVICE_IP.strip() == "":
-            from PyQt5.QtWidgets import QMessageBox
             QMessageBox.warning(self, "No IP Set", "Please set the Divoom device IP in the settings before sending.")
             return
 
-        pic_id = int(time.time())
-        speed = DEFAULT_SPEED
-        quality = DEFAULT_QUALITY
-
-        for screen_index, screen in enumerate(theme["screens"]):
-            img_type = screen["type"]
-            img_data = base64.b64decode(screen["data"])
-            if img_type == "gif":
-                img = Image.open(io.BytesIO(img_data))
-                frames = [fr.convert("RGB") for fr in ImageSequence.Iterator(img)]
+        send_queue = get_send_queue()
+        force = force_requested()
+        for screen_index, screen in enumerate(theme.screens):
+            label = f"{theme.name} - Screen {screen_index+1}"
+            if screen.legacy:
+                job = GifJob(
+                    label, DEVICE_IP, lcd_array_for(screen_index), loader=screen.decode_frames,
+                    speed=screen.speed, quality=screen.quality, timeout=2,
+                    digest=screen.digest, force=force
+                )
             else:
-                img = Image.open(io.BytesIO(img_data)).convert("RGB")
-                frames = [img]
-
-            lcd = [0] * SCREEN_COUNT
-            lcd[screen_index] = 1
-
-            for offset, frame in enumerate(frames):
-                buf = io.BytesIO()
-                frame.save(buf, format="JPEG", quality=quality)
-                b64 = base64.b64encode(buf.getvalue()).decode()
-
-                payload = {
-                    "Command":   "Draw/SendHttpGif",
-                    "LcdArray":  lcd,
-                    "PicNum":    len(frames),
-                    "PicOffset": offset,
-                    "PicID":     pic_id,
-                    "PicSpeed":  speed,
-                    "PicWidth":  IMG_SIZE,
-                    "PicData":   b64
-                }
-                try:
-                    requests.post(f"http://{DEVICE_IP}/post", json=payload, timeout=2)
-                    time.sleep(0.2)  # match per-frame delay
-                except Exception as e:
-                    from PyQt5.QtWidgets import QMessageBox
-                    QMessageBox.warning(self, "Network Error", f"Failed to send to device:\n{e}")
-                    return
-            time.sleep(0.3)  # match per-screen delay
+                # Frames are stored as the exact JPEGs the device gets
+                job = JpegGifJob(
+                    label, DEVICE_IP, lcd_array_for(screen_index), loader=screen.jpeg_frames,
+                    speed=screen.speed, quality=screen.quality, timeout=2,
+                    digest=screen.digest, force=force
+                )
+            send_queue.submit(job)
 
     def delete_theme(self, fname):
         path = os.path.join(THEMES_DIR, fname)
@@ -282,4 +368,5 @@ class ThemesTab(QWidget):
             if reply != QMessageBox.Yes:
                 return
             os.remove(path)
+        # The rescan drops the card and collects blobs only this theme used
         self.refresh_themes()
\ No newline at end of file
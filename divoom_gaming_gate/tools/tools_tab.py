@@ -1,8 +1,4 @@
-import requests
 import os
-import base64
-import time
-from io import BytesIO
 from PIL import Image
 from PIL.ImageQt import toqimage
 from PyQt5.QtCore import Qt
@@ -12,6 +8,10 @@ from PyQt5.QtWidgets import (
     QColorDialog, QComboBox, QFileDialog, QPushButton, QSlider, QSizePolicy
 )
 from ..utils.config import Config
+from ..utils.device import Command, get_client
+from ..utils.send_queue import get_send_queue, GifJob, lcd_array_for, force_requested
+from ..utils.device_state import get_mirror
+from ..utils.batching import queue_command
 
 def pil_to_qimage(img):
     """Convert PIL Image to QImage (works with Pillow 10+)"""
@@ -389,78 +389,33 @@ class ToolsTab(QWidget):
         main_layout.addWidget(send_text_group, alignment=Qt.AlignTop | Qt.AlignLeft)
 
     def send_scoreboard(self):
-        ip = self.cfg.get_device_ip()
-        blue = self.blue_score.value()
-        red = self.red_score.value()
-        if not ip:
-            return
-        payload = {
-            "Command": "Tools/SetScoreBoard",
-            "BlueScore": blue,
-            "RedScore": red
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=8)
-        except Exception:
-            pass
+        queue_command(
+            self.cfg.get_device_ip(),
+            Command.set_scoreboard(self.blue_score.value(), self.red_score.value())
+        )
 
     def send_countdown(self):
-        ip = self.cfg.get_device_ip()
-        minutes = self.timer_minutes.value()
-        seconds = self.timer_seconds.value()
-        if not ip:
-            return
-        payload = {
-            "Command": "Tools/SetTimer",
-            "Minute": minutes,
-            "Second": seconds,
-            "Status": 1  # 1 = start, 0 = stop
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=8)
-        except Exception:
-            pass
+        queue_command(
+            self.cfg.get_device_ip(),
+            # Status 1 = start, 0 = stop
+            Command.set_timer(self.timer_minutes.value(), self.timer_seconds.value(), status=1)
+        )
 
     def send_stopwatch(self, status):
-        ip = self.cfg.get_device_ip()
-        if not ip:
-            return
-        payload = {
-            "Command": "Tools/SetStopWatch",
-            "Status": status  # 2:reset; 1: start; 0: stop
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=8)
-        except Exception:
-            pass
+        queue_command(self.cfg.get_device_ip(), Command.set_stopwatch(status))  # 2:reset; 1: start; 0: stop
 
     def send_buzzer(self):
-        ip = self.cfg.get_device_ip()
-        if not ip:
-            return
-        payload = {
-            "Command": "Device/PlayBuzzer",
-            "ActiveTimeInCycle": self.buzzer_active.value(),
-            "OffTimeInCycle": self.buzzer_off.value(),
-            "PlayTotalTime": self.buzzer_total.value()
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=8)
-        except Exception:
-            pass
+        queue_command(
+            self.cfg.get_device_ip(),
+            Command.play_buzzer(
+                self.buzzer_active.value(),
+                self.buzzer_off.value(),
+                self.buzzer_total.value()
+            )
+        )
 
     def send_noise(self, status):
-        ip = self.cfg.get_device_ip()
-        if not ip:
-            return
-        payload = {
-            "Command": "Tools/SetNoiseStatus",
-            "NoiseStatus": status  # 1 = start, 0 = stop
-        }
-        try:
-            requests.post(f"http://{ip}/post", json=payload, timeout=8)
-        except Exception:
-            pass
+        queue_command(self.cfg.get_device_ip(), Command.set_noise_status(status))  # 1 = start, 0 = stop
 
     def import_banner_image(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select Banner Image", "", "Images (*.png *.jpg *.jpeg *.bmp *.gif)")
@@ -521,29 +476,18 @@ class ToolsTab(QWidget):
             return
 
         # Split into 5 sections and send
+        send_queue = get_send_queue()
+        force = force_requested()
         for i in range(5):
             section = self.banner_preview.crop((i*128, 0, (i+1)*128, 128))
-            buf = BytesIO()
-            section.save(buf, format="JPEG", quality=85)
-            b64 = base64.b64encode(buf.getvalue()).decode()
-            payload = {
-                "Command": "Draw/SendHttpGif",
-                "LcdArray": [1 if j == i else 0 for j in range(5)],
-                "PicNum": 1,
-                "PicOffset": 0,
-                "PicID": int(time.time()) + i,
-                "PicSpeed": 100,
-                "PicWidth": 128,
-                "PicData": b64
-            }
-            try:
-                requests.post(f"http://{ip}/post", json=payload, timeout=8)
-            except Exception as e:
-                QMessageBox.warning(self, "Send Error", f"Failed to send to screen {i+1}:\n{e}")
+            send_queue.submit(GifJob(
+                f"Banner - Screen {i+1}", ip, lcd_array_for(i),
+                frames=[section], quality=85, force=force
+            ))
 
     def send_text_to_screen(self):
-        ip = self.cfg.get_device_ip()
-        if not ip:
+        client = get_client(self.cfg.get_device_ip())
+        if not client:
             QMessageBox.warning(self, "No IP", "No device IP set.")
             return
         text = self.text_input.text().strip()
@@ -565,22 +509,12 @@ class ToolsTab(QWidget):
         color = self.text_color.text().strip() or "#FFFF00"
         align_map = {"Left": 0, "Center": 1, "Right": 2}
         align = align_map[self.align_combo.currentText()]
-        payload = {
-            "Command": "Draw/SendHttpText",
-            "LcdId": lcd_id,
-            "TextId": 4,
-            "x": x,
-            "y": y,
-            "dir": direction,
-            "font": font,
-            "TextWidth": text_width,
-            "speed": speed,
-            "TextString": text,
-            "color": color,
-            "align": align
-        }
+        get_mirror().invalidate(client.ip, lcd_id)
         try:
-            resp = requests.post(f"http://{ip}/post", json=payload, timeout=8)
+            resp = client.send_http_text(
+                lcd_id, text, x=x, y=y, direction=direction, font=font,
+                text_width=text_width, speed=speed, color=color, align=align
+            )
             if resp.ok:
                 QMessageBox.information(self, "Success", f"Text sent to screen {lcd_id+1}.")
             else:
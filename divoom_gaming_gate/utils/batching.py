@@ -0,0 +1,64 @@
+# utils/batching.py
+
+from PyQt5.QtCore import QObject, QTimer
+
+from .device import command
+from .send_queue import send_command
+
+BATCH_WINDOW_MS = 60
+
+
+class CommandBatcher(QObject):
+    """Coalesce settings/tools commands into one Draw/CommandList request.
+
+    Commands queued within ``BATCH_WINDOW_MS`` of the first pending one go out
+    together. A later command with the same name replaces the earlier one, so
+    dragging a slider only sends the latest value.
+    """
+
+    def __init__(self, window_ms=BATCH_WINDOW_MS, parent=None):
+        super().__init__(parent)
+        self._pending = {}   # ip -> {command name: (payload, silent)}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(window_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def queue(self, ip, payload, silent=True):
+        ip = (ip or "").strip()
+        if not ip:
+            return
+        cmds = self._pending.setdefault(ip, {})
+        cmds.pop(payload["Command"], None)  # keep the latest value, in issue order
+        cmds[payload["Command"]] = (payload, silent)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        pending, self._pending = self._pending, {}
+        for ip, cmds in pending.items():
+            entries = list(cmds.values())
+            silent = all(s for _, s in entries)
+            if len(entries) == 1:
+                payload = entries[0][0]
+                send_command(ip, payload, timeout=4, silent=silent)
+            else:
+                payload = command("Draw/CommandList", CommandList=[p for p, _ in entries])
+                label = f"{len(entries)} device commands"
+                send_command(ip, payload, label=label, timeout=4, silent=silent)
+
+
+_batcher = None
+
+
+def get_batcher():
+    global _batcher
+    if _batcher is None:
+        _batcher = CommandBatcher()
+    return _batcher
+
+
+def queue_command(ip, payload, silent=True):
+    """Queue ``payload`` for the next batched CommandList to ``ip``."""
+    get_batcher().queue(ip, payload, silent)
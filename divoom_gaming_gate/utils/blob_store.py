@@ -0,0 +1,125 @@
+# utils/blob_store.py
+#
+# Content-addressed store for theme frames. Each blob is saved once under
+# its hash, however many themes (or screens within a theme) use it, and
+# themes only keep the hashes.
+#
+# Reference counts are not stored separately: they are rebuilt from the
+# theme files actually present when garbage is collected, so copying,
+# renaming or deleting themes outside the app can't leave a theme pointing
+# at collected blobs. Blobs written by a save that hasn't replaced its file
+# yet are pinned in memory until it has.
+
+import hashlib
+import os
+import threading
+from collections import Counter
+
+from divoom_gaming_gate.utils.paths import BLOBS_DIR
+
+DIGEST_SIZE = 20
+
+
+def blob_key(data):
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+class MissingBlobError(Exception):
+    pass
+
+
+class BlobStore:
+    def __init__(self, root=BLOBS_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._pins = Counter()     # key -> saves in progress using it
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def has(self, key):
+        return os.path.exists(self.path(key))
+
+    def _write(self, data):
+        key = blob_key(data)
+        path = self.path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return key
+
+    def put(self, blobs):
+        """Store ``blobs`` (skipping ones already present) and pin them until
+        ``unpin``, so a collect can't remove them before the theme that uses
+        them is on disk. Returns their keys in order."""
+        with self._lock:
+            keys = [self._write(data) for data in blobs]
+            self._pins.update(keys)
+        return keys
+
+    def pin(self, keys):
+        """Pin blobs that are already stored, e.g. reused from an older save."""
+        with self._lock:
+            missing = [k for k in keys if not os.path.exists(self.path(k))]
+            if missing:
+                raise MissingBlobError(f"{len(missing)} frame(s) missing from the blob store")
+            self._pins.update(keys)
+
+    def unpin(self, keys):
+        with self._lock:
+            self._pins.subtract(keys)
+            self._pins += Counter()   # drop keys that reached zero
+
+    def get(self, key):
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise MissingBlobError(f"frame {key} is missing from the blob store")
+
+    def get_many(self, keys):
+        cache = {}
+        for key in keys:
+            if key not in cache:
+                cache[key] = self.get(key)
+        return [cache[key] for key in keys]
+
+    def collect(self, find_refs):
+        """Delete blobs that no theme uses.
+
+        ``find_refs()`` returns a Counter of keys used by the themes on disk,
+        or None if that can't be known for sure (then nothing is deleted).
+        It runs under the store lock, so no save can slip in between
+        reading the themes and deleting. Returns the number of blobs removed.
+        """
+        with self._lock:
+            refs = find_refs()
+            if refs is None:
+                return 0
+            removed = 0
+            for dirpath, _, files in os.walk(self.root):
+                for name in files:
+                    if len(name) != DIGEST_SIZE * 2 or refs[name] or self._pins[name]:
+                        continue
+                    try:
+                        os.remove(os.path.join(dirpath, name))
+                        removed += 1
+                    except OSError:
+                        pass
+            return removed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore()
+        return _store
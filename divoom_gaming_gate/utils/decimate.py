@@ -0,0 +1,68 @@
+# utils/decimate.py
+
+from PIL import Image, ImageChops, ImageStat
+
+MAX_DEVICE_FRAMES = 60   # PicNum limit of Draw/SendHttpGif
+THUMB_SIZE        = 32
+# Share of the selection spread evenly over time rather than by motion, so
+# long still stretches keep some presence instead of vanishing completely.
+TIME_WEIGHT       = 0.25
+
+
+def frame_differences(frames, size=THUMB_SIZE):
+    """Mean absolute difference (0-255) between each frame and the one before it.
+
+    Each frame is reduced to a small greyscale thumbnail and compared with the
+    previous one, a few Pillow calls per frame; the first entry is always 0.
+    """
+    thumbs = [f.convert("L").resize((size, size), Image.BILINEAR) for f in frames]
+    diffs = [0.0]
+    for prev, cur in zip(thumbs, thumbs[1:]):
+        diffs.append(ImageStat.Stat(ImageChops.difference(prev, cur)).mean[0])
+    return diffs
+
+
+def decimate_indices(frames, target, diffs=None):
+    """Pick ``target`` frame indices, favouring motion over near-duplicates.
+
+    Frames are sampled evenly along the sequence's cumulative motion, so runs
+    of near-identical frames collapse to one while busy stretches keep most of
+    theirs. The frame at each of the biggest motion peaks is kept as well.
+    Always keeps frame 0 and returns indices in order.
+    """
+    count = len(frames)
+    if target <= 0 or count <= target:
+        return list(range(count))
+    if diffs is None:
+        diffs = frame_differences(frames)
+    mean = (sum(diffs) / (count - 1)) if count > 1 else 0.0
+    weights = [d + TIME_WEIGHT * (mean or 1.0) for d in diffs]
+    weights[0] = 0.0
+    total = sum(weights)
+
+    # Motion peaks: frames that differ most from their neighbours
+    peaks = sorted(range(1, count), key=lambda i: diffs[i], reverse=True)[:max(1, target // 4)]
+    keep = {0} | set(peaks)
+
+    # Fill the rest by even spacing along cumulative weight
+    slots = target - len(keep)
+    if slots > 0:
+        step = total / (slots + 1)
+        cumulative, next_mark = 0.0, step
+        for i in range(1, count):
+            cumulative += weights[i]
+            if cumulative >= next_mark and i not in keep:
+                keep.add(i)
+                next_mark += step
+                if len(keep) >= target:
+                    break
+    # Top up (rounding, collisions with peaks) with the largest remaining changes
+    if len(keep) < target:
+        rest = sorted((i for i in range(count) if i not in keep), key=lambda i: diffs[i], reverse=True)
+        keep.update(rest[:target - len(keep)])
+    return sorted(keep)[:target]
+
+
+def decimate(frames, target):
+    """Reduce ``frames`` to at most ``target``; see ``decimate_indices``."""
+    return [frames[i] for i in decimate_indices(frames, target)]
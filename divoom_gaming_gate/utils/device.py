@@ -0,0 +1,193 @@
+# utils/device.py
+
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import Config
+
+DEFAULT_TIMEOUT = 8
+POOL_SIZE       = 4
+IMG_SIZE        = 128
+
+
+def command(name, **fields):
+    payload = {"Command": name}
+    payload.update(fields)
+    return payload
+
+
+class Command:
+    """Builders for the device command payloads this app uses."""
+
+    # --- Draw ---
+    @staticmethod
+    def send_http_gif(lcd_array, pic_num, pic_offset, pic_id, pic_speed, pic_data, pic_width=IMG_SIZE):
+        return command(
+            "Draw/SendHttpGif",
+            LcdArray=lcd_array,
+            PicNum=pic_num,
+            PicOffset=pic_offset,
+            PicID=pic_id,
+            PicSpeed=pic_speed,
+            PicWidth=pic_width,
+            PicData=pic_data,
+        )
+
+    @staticmethod
+    def send_http_text(lcd_id, text, x=32, y=40, direction=0, font=4, text_width=64,
+                       speed=50, color="#FFFF00", align=1, text_id=4):
+        return command(
+            "Draw/SendHttpText",
+            LcdId=lcd_id,
+            TextId=text_id,
+            x=x,
+            y=y,
+            dir=direction,
+            font=font,
+            TextWidth=text_width,
+            speed=speed,
+            TextString=text,
+            color=color,
+            align=align,
+        )
+
+    # --- Tools ---
+    @staticmethod
+    def set_scoreboard(blue, red):
+        return command("Tools/SetScoreBoard", BlueScore=blue, RedScore=red)
+
+    @staticmethod
+    def set_timer(minute, second, status=1):
+        return command("Tools/SetTimer", Minute=minute, Second=second, Status=status)
+
+    @staticmethod
+    def set_stopwatch(status):
+        # 2: reset; 1: start; 0: stop
+        return command("Tools/SetStopWatch", Status=status)
+
+    @staticmethod
+    def set_noise_status(status):
+        return command("Tools/SetNoiseStatus", NoiseStatus=status)
+
+    # --- Channel ---
+    @staticmethod
+    def set_brightness(brightness):
+        return command("Channel/SetBrightness", Brightness=brightness)
+
+    @staticmethod
+    def on_off_screen(on_off):
+        return command("Channel/OnOffScreen", OnOff=on_off)
+
+    # --- Device / Sys ---
+    @staticmethod
+    def set_timezone(tz_value):
+        return command("Sys/TimeZone", TimeZoneValue=tz_value)
+
+    @staticmethod
+    def set_utc(utc):
+        return command("Device/SetUTC", Utc=utc)
+
+    @staticmethod
+    def set_time24_flag(mode):
+        # 0 for 12-hour, 1 for 24-hour
+        return command("Device/SetTime24Flag", Mode=mode)
+
+    @staticmethod
+    def play_buzzer(active_time, off_time, total_time):
+        return command(
+            "Device/PlayBuzzer",
+            ActiveTimeInCycle=active_time,
+            OffTimeInCycle=off_time,
+            PlayTotalTime=total_time,
+        )
+
+    @staticmethod
+    def reboot():
+        return command("Device/SysReboot")
+
+
+class DivoomClient:
+    """Keep-alive HTTP client for a single Times Gate."""
+
+    def __init__(self, ip, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE):
+        self.ip = ip
+        self.url = f"http://{ip}/post"
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+
+    def post(self, payload, timeout=None):
+        return self.session.post(self.url, json=payload, timeout=timeout or self.timeout)
+
+    def close(self):
+        self.session.close()
+
+    def send_http_gif(self, *args, timeout=None, **kwargs):
+        return self.post(Command.send_http_gif(*args, **kwargs), timeout)
+
+    def send_http_text(self, *args, timeout=None, **kwargs):
+        return self.post(Command.send_http_text(*args, **kwargs), timeout)
+
+    def set_scoreboard(self, blue, red, timeout=None):
+        return self.post(Command.set_scoreboard(blue, red), timeout)
+
+    def set_timer(self, minute, second, status=1, timeout=None):
+        return self.post(Command.set_timer(minute, second, status), timeout)
+
+    def set_stopwatch(self, status, timeout=None):
+        return self.post(Command.set_stopwatch(status), timeout)
+
+    def set_noise_status(self, status, timeout=None):
+        return self.post(Command.set_noise_status(status), timeout)
+
+    def set_brightness(self, brightness, timeout=None):
+        return self.post(Command.set_brightness(brightness), timeout)
+
+    def on_off_screen(self, on_off, timeout=None):
+        return self.post(Command.on_off_screen(on_off), timeout)
+
+    def set_timezone(self, tz_value, timeout=None):
+        return self.post(Command.set_timezone(tz_value), timeout)
+
+    def set_utc(self, utc, timeout=None):
+        return self.post(Command.set_utc(utc), timeout)
+
+    def set_time24_flag(self, mode, timeout=None):
+        return self.post(Command.set_time24_flag(mode), timeout)
+
+    def play_buzzer(self, active_time, off_time, total_time, timeout=None):
+        return self.post(Command.play_buzzer(active_time, off_time, total_time), timeout)
+
+    def reboot(self, timeout=None):
+        return self.post(Command.reboot(), timeout)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+_last_pic_id = 0
+
+
+def next_pic_id():
+    """Time-based PicID that never repeats, even for uploads started in the same second."""
+    global _last_pic_id
+    with _clients_lock:
+        _last_pic_id = max(int(time.time()), _last_pic_id + 1)
+        return _last_pic_id
+
+
+def get_client(ip=None):
+    """Return the shared client for ``ip`` (defaults to the configured device IP)."""
+    if ip is None:
+        ip = Config.get_device_ip()
+    ip = (ip or "").strip()
+    if not ip:
+        return None
+    with _clients_lock:
+        client = _clients.get(ip)
+        if client is None:
+            client = DivoomClient(ip)
+            _clients[ip] = client
+        return client
@@ -0,0 +1,66 @@
+# utils/device_state.py
+
+import hashlib
+import threading
+
+
+def frames_digest(frames, speed, quality):
+    """Content hash of an animation as the device would show it."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{speed}:{quality}:{len(frames)}".encode())
+    for frame in frames:
+        h.update(f"{frame.mode}{frame.size}".encode())
+        h.update(frame.tobytes())
+    return h.hexdigest()
+
+
+def data_digest(data, speed, quality):
+    """Content hash for an animation we only have in encoded form (e.g. a theme screen)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{speed}:{quality}:".encode())
+    h.update(data if isinstance(data, bytes) else data.encode())
+    return h.hexdigest()
+
+
+class DeviceStateMirror:
+    """What each LCD is showing, as far as this app knows.
+
+    Keyed by device IP and LcdArray index. An entry is only written after an
+    upload completes, and cleared as soon as a new upload or text overlay
+    starts on that LCD.
+    """
+
+    def __init__(self):
+        self._screens = {}
+        self._lock = threading.Lock()
+
+    def is_showing(self, ip, lcd_array, digest):
+        indices = [i for i, on in enumerate(lcd_array) if on]
+        with self._lock:
+            return bool(indices) and all(self._screens.get((ip, i)) == digest for i in indices)
+
+    def update(self, ip, lcd_array, digest):
+        with self._lock:
+            for i, on in enumerate(lcd_array):
+                if on:
+                    self._screens[(ip, i)] = digest
+
+    def invalidate(self, ip, lcd_index=None):
+        with self._lock:
+            if lcd_index is None:
+                for key in [k for k in self._screens if k[0] == ip]:
+                    del self._screens[key]
+            else:
+                self._screens.pop((ip, lcd_index), None)
+
+    def invalidate_lcds(self, ip, lcd_array):
+        for i, on in enumerate(lcd_array):
+            if on:
+                self.invalidate(ip, i)
+
+
+_mirror = DeviceStateMirror()
+
+
+def get_mirror():
+    return _mirror
@@ -0,0 +1,106 @@
+# utils/encoding.py
+
+import io, base64, os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_QUALITY = 85
+MIN_QUALITY     = 40
+MAX_QUALITY     = 95
+
+
+def encode_jpeg(frame, quality=DEFAULT_QUALITY):
+    buf = io.BytesIO()
+    frame.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def encode_frame(frame, quality=DEFAULT_QUALITY):
+    """JPEG-encode a PIL frame and return it base64'd, ready for PicData."""
+    return base64.b64encode(encode_jpeg(frame, quality)).decode()
+
+
+def encode_to_budget(frame, max_bytes, start=None, lo=MIN_QUALITY, hi=MAX_QUALITY):
+    """Highest-quality JPEG of ``frame`` that fits in ``max_bytes``.
+
+    Binary search over quality; every trial encode is kept so the winner is
+    never encoded twice. ``start`` (usually the previous frame's quality) is
+    probed first, since neighbouring frames tend to land on the same value.
+    Falls back to ``lo`` if nothing fits. Returns ``(jpeg_bytes, quality)``.
+    """
+    trials = {}
+
+    def size_at(q):
+        if q not in trials:
+            trials[q] = encode_jpeg(frame, q)
+        return len(trials[q])
+
+    best = None
+    if start is not None and lo <= start <= hi:
+        if size_at(start) <= max_bytes:
+            best, lo = start, start + 1
+        else:
+            hi = start - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if size_at(mid) <= max_bytes:
+            best, lo = mid, mid + 1
+        else:
+            hi = mid - 1
+    if best is None:
+        best = min(trials) if trials else lo
+        size_at(best)
+    return trials[best], best
+
+
+class BudgetEncoder:
+    """Per-frame JPEG quality chosen to meet a byte budget.
+
+    ``frame_bytes`` caps every frame; ``total_bytes`` caps the whole animation
+    and is shared out as frames are encoded, so bytes left over by flat frames
+    go to busier ones later on. Results are kept per frame index, so a resumed
+    upload re-sends exactly what it sent before.
+    """
+
+    def __init__(self, frame_bytes=None, total_bytes=None):
+        self.frame_bytes = frame_bytes
+        self.total_bytes = total_bytes
+        self.encoded = {}     # index -> (jpeg bytes, quality)
+        self._last_quality = None
+
+    def budget_for(self, index, count):
+        budget = self.frame_bytes
+        if self.total_bytes:
+            spent = sum(len(data) for i, (data, _) in self.encoded.items() if i != index)
+            remaining = count - len([i for i in self.encoded if i != index])
+            share = max(1, (self.total_bytes - spent) // max(1, remaining))
+            budget = min(budget, share) if budget else share
+        return budget
+
+    def encode(self, frames, index):
+        if index not in self.encoded:
+            budget = self.budget_for(index, len(frames))
+            self.encoded[index] = encode_to_budget(frames[index], budget, start=self._last_quality)
+            self._last_quality = self.encoded[index][1]
+        return self.encoded[index][0]
+
+    def describe(self):
+        """Stable key for content digests, standing in for a fixed quality."""
+        return f"budget:{self.frame_bytes or 0}:{self.total_bytes or 0}"
+
+
+# Pillow releases the GIL while resizing and JPEG-encoding, so a thread pool
+# spreads frame encoding over all cores without pickling images to processes.
+ENCODE_WORKERS = max(2, os.cpu_count() or 2)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_encode_pool():
+    """Shared pool for decoding/encoding frames ahead of the uploader."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix="encode")
+        return _pool
@@ -0,0 +1,116 @@
+# utils/frame_store.py
+
+import json, os
+import mmap
+import tempfile
+import threading
+
+from PIL import Image
+
+from .paths import SETTINGS_FILE, USER_DATA_DIR
+
+WORKING_SIZE     = 512    # longest side kept for source frames; plenty for a 128px LCD
+DEFAULT_BUDGET_MB = 256   # RAM for source frames across all screens
+SCREEN_COUNT     = 5
+SCRATCH_DIR      = os.path.join(USER_DATA_DIR, "scratch")
+
+
+def frame_memory_budget():
+    """Per-screen RAM budget in bytes, from the Frame Memory setting."""
+    mb = DEFAULT_BUDGET_MB
+    if os.path.exists(SETTINGS_FILE):
+        try:
+            with open(SETTINGS_FILE, "r") as f:
+                mb = int(json.load(f).get("frame_memory_mb", DEFAULT_BUDGET_MB))
+        except Exception:
+            pass
+    return max(1, mb) * 1024 * 1024 // SCREEN_COUNT
+
+
+def reduce_frame(img, max_side=WORKING_SIZE):
+    """Downscale ``img`` so its longest side is at most ``max_side``."""
+    if max(img.size) <= max_side:
+        return img
+    img = img.copy()
+    img.thumbnail((max_side, max_side), Image.LANCZOS)
+    return img
+
+
+class FrameStore:
+    """List-like store of RGB source frames with a RAM budget.
+
+    Frames are reduced to ``WORKING_SIZE`` on the way in. Once the frames held
+    in memory reach ``budget`` bytes, further ones are written raw to a scratch
+    file and read back through a memory map on access.
+    """
+
+    def __init__(self, budget=None, frames=()):
+        self.budget = frame_memory_budget() if budget is None else budget
+        self.ram_bytes = 0
+        self._entries = []     # PIL image, or (offset, size) into the scratch file
+        self._file = None
+        self._map = None
+        self._lock = threading.Lock()
+        for img in frames:
+            self.append(img)
+
+    def append(self, img):
+        img = reduce_frame(img.convert("RGB") if img.mode != "RGB" else img)
+        cost = img.width * img.height * 3
+        if self.ram_bytes + cost <= self.budget or not self._entries:
+            self._entries.append(img)
+            self.ram_bytes += cost
+            return
+        with self._lock:
+            if self._file is None:
+                os.makedirs(SCRATCH_DIR, exist_ok=True)
+                self._file = tempfile.TemporaryFile(dir=SCRATCH_DIR)
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(img.tobytes())
+        self._entries.append((offset, img.size))
+
+    def _load(self, entry):
+        if isinstance(entry, Image.Image):
+            return entry
+        offset, size = entry
+        length = size[0] * size[1] * 3
+        with self._lock:
+            if self._map is None or offset + length > len(self._map):
+                # File grew since the last mapping
+                if self._map is not None:
+                    self._map.close()
+                self._file.flush()
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return Image.frombytes("RGB", size, self._map[offset:offset + length])
+
+    @property
+    def spilled(self):
+        return sum(1 for e in self._entries if not isinstance(e, Image.Image))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._load(e) for e in self._entries[index]]
+        return self._load(self._entries[index])
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def iter_from(self, start):
+        """Frames from ``start`` on, loaded one at a time (a slice loads them all)."""
+        for i in range(start, len(self._entries)):
+            yield self._load(self._entries[i])
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._entries = []
+        self.ram_bytes = 0
@@ -1,4 +1,38 @@
-from PIL import Image, ImageDraw, ImageFont
+import io
+from PIL import Image, ImageDraw, ImageFont, ImageSequence
+
+IMG_SIZE = 128
+
+def normalize_frame(img, mode, size=IMG_SIZE):
+    """Resize a source frame to the LCD square using an import mode (Stretch/Fit/Crop)."""
+    w,h = img.size
+    if mode == "Fit":
+        thumb = img.copy()
+        thumb.thumbnail((size,size), Image.LANCZOS)
+        bg = Image.new("RGB",(size,size),(0,0,0))
+        bg.paste(thumb, ((size-thumb.width)//2,(size-thumb.height)//2))
+        return bg
+    if mode == "Crop":
+        side = min(w,h)
+        left = (w-side)//2; top=(h-side)//2
+        crop = img.crop((left,top,left+side,top+side))
+        return crop.resize((size,size),Image.LANCZOS)
+    # Stretch, and the fallback for unknown modes
+    return img.resize((size,size), Image.LANCZOS)
+
+def open_source(source):
+    """Open an image from a file path or raw bytes."""
+    return Image.open(source if isinstance(source, str) else io.BytesIO(source))
+
+def iter_frames(img, skip=1, start=0):
+    """Lazily yield RGB copies of frames ``start``, ``start+skip``, ...
+
+    GIF frames still have to be walked in order, but only the kept ones are
+    converted (and so held in memory).
+    """
+    for i, fr in enumerate(ImageSequence.Iterator(img)):
+        if i >= start and (i - start) % skip == 0:
+            yield fr.convert("RGB")
 
 def compose_character_image(background, portrait, name, stats):
     img = Image.new('RGB',(128,128),'black')
@@ -0,0 +1,121 @@
+# utils/pacing.py
+
+import json, os
+import threading
+import time
+
+from .paths import PACING_FILE
+
+DEFAULT_RATE = 5.0    # frames/sec, the old fixed 0.2 s per frame
+MIN_RATE     = 0.5
+MAX_RATE     = 40.0
+RATE_STEP    = 0.5    # additive increase per acknowledged frame
+BACKOFF      = 0.5    # multiplicative decrease on error or congestion
+
+# A request counts as congested when it takes this much longer than the
+# fastest round trip seen recently.
+LATENCY_FACTOR = 2.0
+LATENCY_SLACK  = 0.05
+
+# Recent failure rate (exponential average) above which the rate stops
+# climbing and a finished upload doesn't raise the remembered best rate.
+ERROR_DECAY      = 0.9
+ERROR_RATE_LIMIT = 0.05
+
+
+class PacingController:
+    """AIMD rate control for uploads to one device.
+
+    The rate creeps up while the device answers promptly and halves as soon
+    as a request fails or its latency climbs well above the baseline. While
+    requests have been failing recently it holds steady instead of climbing.
+    """
+
+    def __init__(self, ip, rate=DEFAULT_RATE, best_rate=None):
+        self.ip = ip
+        self.rate = min(max(rate, MIN_RATE), MAX_RATE)
+        self.best_rate = best_rate or self.rate
+        self.base_latency = None
+        self.error_rate = 0.0
+        self._next_send = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next request may start."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_send - now
+            self._next_send = max(now, self._next_send) + 1.0 / self.rate
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.error_rate = ERROR_DECAY * self.error_rate + (0.0 if ok else 1.0 - ERROR_DECAY)
+            if not ok:
+                self._decrease()
+                return
+            if self.base_latency is None or latency < self.base_latency:
+                self.base_latency = latency
+            else:
+                # Let the baseline drift up slowly so a one-off fast reply doesn't pin it
+                self.base_latency += (latency - self.base_latency) * 0.01
+            if latency > self.base_latency * LATENCY_FACTOR + LATENCY_SLACK:
+                self._decrease()
+            elif self.error_rate <= ERROR_RATE_LIMIT:
+                self.rate = min(MAX_RATE, self.rate + RATE_STEP)
+
+    def _decrease(self):
+        self.rate = max(MIN_RATE, self.rate * BACKOFF)
+        # Give the device a moment to drain before the next request
+        self._next_send = time.monotonic() + 1.0 / self.rate
+
+    def job_done(self, clean):
+        """Remember the rate reached by a finished upload for next time."""
+        with self._lock:
+            if clean and self.error_rate <= ERROR_RATE_LIMIT and self.rate > self.best_rate:
+                self.best_rate = self.rate
+            elif not clean:
+                self.best_rate = min(self.best_rate, self.rate)
+        save_pacers()
+
+    def to_dict(self):
+        return {"rate": self.rate, "best_rate": self.best_rate}
+
+
+_pacers = {}
+_pacers_lock = threading.Lock()
+
+
+def _load_saved():
+    if os.path.exists(PACING_FILE):
+        try:
+            with open(PACING_FILE, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+
+def get_pacer(ip):
+    """Return the pacing controller for ``ip``, starting from its best known rate."""
+    with _pacers_lock:
+        pacer = _pacers.get(ip)
+        if pacer is None:
+            saved = _load_saved().get(ip, {})
+            best = saved.get("best_rate")
+            pacer = PacingController(ip, rate=best or DEFAULT_RATE, best_rate=best)
+            _pacers[ip] = pacer
+        return pacer
+
+
+def save_pacers():
+    with _pacers_lock:
+        data = _load_saved()
+        for ip, pacer in _pacers.items():
+            data[ip] = pacer.to_dict()
+    try:
+        with open(PACING_FILE, "w") as f:
+            json.dump(data, f, indent=2)
+    except Exception:
+        pass
@@ -9,6 +9,10 @@ USER_DATA_DIR = user_data_dir(APP_NAME, APP_AUTHOR)
 THEMES_DIR = os.path.join(USER_DATA_DIR, "themes")
 CHARACTER_DIR = os.path.join(USER_DATA_DIR, "characters")
 SETTINGS_FILE = os.path.join(USER_DATA_DIR, "settings.json")
+PACING_FILE = os.path.join(USER_DATA_DIR, "pacing.json")
+THEME_INDEX_FILE = os.path.join(USER_DATA_DIR, "theme_index.json")
+PREVIEW_CACHE_DIR = os.path.join(USER_DATA_DIR, "previews")
+BLOBS_DIR = os.path.join(USER_DATA_DIR, "blobs")
 
 # Ensure directories exist
 os.makedirs(THEMES_DIR, exist_ok=True)
@@ -0,0 +1,76 @@
+# utils/payload_cache.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+ENTRY_OVERHEAD  = 200   # rough per-entry cost of the key, tuple and dict slot
+
+
+def frame_digest(frame):
+    """Content hash of a single PIL frame."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{frame.mode}{frame.size}".encode())
+    h.update(frame.tobytes())
+    return h.digest()
+
+
+class PayloadCache:
+    """LRU of encoded PicData strings keyed by (frame content, quality).
+
+    Shared by every tab, so re-sending the same screen or theme skips the
+    JPEG/base64 step. Evicts least recently used entries once the cached
+    strings add up to more than ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, frame, quality, encode):
+        """Cached PicData for ``frame`` at ``quality``; calls ``encode()`` on a miss."""
+        key = (frame_digest(frame), quality)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+        data = encode()
+        self.put(key, data)
+        return data
+
+    def put(self, key, data):
+        cost = len(data) + ENTRY_OVERHEAD
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old) + ENTRY_OVERHEAD
+            self._entries[key] = data
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted) + ENTRY_OVERHEAD
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = PayloadCache()
+
+
+def get_payload_cache():
+    return _cache
@@ -0,0 +1,94 @@
+# utils/preview_clock.py
+
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QImage, QPixmap
+
+MIN_INTERVAL = 20    # ms, fastest any preview is allowed to tick
+IDLE_POLL    = 250   # ms, how often to look for previews becoming visible
+
+
+def pil_to_pixmap(img):
+    """PIL RGB image -> QPixmap."""
+    data = img.tobytes("raw", "RGB")
+    qimg = QImage(data, img.width, img.height, img.width * 3, QImage.Format_RGB888)
+    return QPixmap.fromImage(qimg)   # copies, so ``data`` may go
+
+
+def _now_ms():
+    return time.monotonic() * 1000.0
+
+
+class PreviewClock(QObject):
+    """One timer driving every preview animation in the app.
+
+    Each animation registers a widget, a frame interval (ms, or a callable
+    returning it) and an ``advance`` callback. Only widgets actually on screen
+    are advanced; with nothing visible the clock drops to a slow poll.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._subs = {}   # widget -> [interval, advance, due]
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self, widget, interval, advance):
+        due = _now_ms() + self._interval(interval)
+        self._subs[widget] = [interval, advance, due]
+        self._schedule()
+
+    def stop(self, widget):
+        if self._subs.pop(widget, None) is not None:
+            self._schedule()
+
+    def is_running(self, widget):
+        return widget in self._subs
+
+    @staticmethod
+    def _interval(interval):
+        value = interval() if callable(interval) else interval
+        return max(MIN_INTERVAL, value or 100)
+
+    @staticmethod
+    def _visible(widget):
+        try:
+            return (widget.isVisible() and not widget.window().isMinimized()
+                    and not widget.visibleRegion().isEmpty())
+        except RuntimeError:   # underlying C++ widget already deleted
+            return None
+
+    def _tick(self):
+        now = _now_ms()
+        for widget, sub in list(self._subs.items()):
+            if sub[2] > now:
+                continue
+            visible = self._visible(widget)
+            if visible is None:
+                self._subs.pop(widget, None)
+                continue
+            if visible:
+                sub[1]()
+            sub[2] = now + self._interval(sub[0])
+        self._schedule()
+
+    def _schedule(self):
+        if not self._subs:
+            self._timer.stop()
+            return
+        now = _now_ms()
+        due = [sub[2] for w, sub in self._subs.items() if self._visible(w)]
+        delay = min(due) - now if due else IDLE_POLL
+        self._timer.start(int(max(0, min(delay, IDLE_POLL))))
+
+
+_clock = None
+
+
+def get_preview_clock():
+    global _clock
+    if _clock is None:
+        _clock = PreviewClock()
+    return _clock
@@ -0,0 +1,410 @@
+# utils/send_queue.py
+
+import base64
+import itertools
+import queue
+import random
+import threading
+import time
+import requests
+
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from .device import Command, get_client, next_pic_id, IMG_SIZE
+from .encoding import encode_frame, get_encode_pool, BudgetEncoder, DEFAULT_QUALITY
+from .pacing import get_pacer
+from .device_state import get_mirror, frames_digest
+from .payload_cache import get_payload_cache
+
+SCREEN_COUNT = 5
+
+
+PRIORITY_COMMAND = 0
+PRIORITY_UPLOAD  = 1
+
+MAX_RETRIES      = 4
+MAX_RESUMABLE    = 10   # failed uploads kept around for resume
+RETRY_BASE_DELAY = 0.25
+RETRY_MAX_DELAY  = 4.0
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class UploadError(Exception):
+    """A payload could not be delivered after retrying."""
+
+    def __init__(self, message, job):
+        super().__init__(message)
+        self.job = job
+
+
+class SendJob:
+    """A unit of work for the send queue. Subclasses provide the payloads."""
+
+    timeout = None
+    priority = PRIORITY_UPLOAD
+    # Silent jobs (fire-and-forget commands) skip the started/progress/failed signals
+    silent = False
+    # Paced jobs go through the device's AIMD pacing controller
+    paced = False
+    retries = MAX_RETRIES
+
+    def __init__(self, label, ip):
+        self.label = label
+        self.ip = ip
+        self.id = None
+        self.acked = set()   # payload indices the device has acknowledged
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def resume_offset(self):
+        """First index the device hasn't acknowledged yet."""
+        index = 0
+        while index in self.acked:
+            index += 1
+        return index
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start_encoding(self):
+        """Called on submit; jobs may start building payloads in the background."""
+
+    def prepare(self):
+        """Called on the worker thread before the first payload is requested."""
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def payload(self, index):
+        raise NotImplementedError
+
+
+class CommandJob(SendJob):
+    """Plain list of ready-made command payloads. Runs ahead of queued uploads."""
+
+    priority = PRIORITY_COMMAND
+    retries = 1
+
+    def __init__(self, label, ip, payloads, timeout=None, silent=True):
+        super().__init__(label, ip)
+        self.payloads = list(payloads)
+        self.timeout = timeout
+        self.silent = silent
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def payload(self, index):
+        return self.payloads[index]
+
+
+class GifJob(SendJob):
+    """Upload an animation (or a single still) to one or more LCDs.
+
+    Frames are decoded (via ``loader``) and JPEG-encoded on the shared encode
+    pool as soon as the job is submitted, so encoding overlaps with whatever
+    is uploading ahead of it; ``payload`` hands them out in PicOffset order as
+    they finish. Acknowledged
+    (PicID, PicOffset) pairs are kept, so a failed upload can be resumed from
+    the first missing frame under the same PicID.
+
+    ``frame_bytes`` / ``total_bytes`` switch from a fixed ``quality`` to a byte
+    budget per frame / per animation (see ``BudgetEncoder``).
+    """
+
+    paced = True
+
+    def __init__(self, label, ip, lcd_array, frames=None, loader=None, speed=100,
+                 quality=DEFAULT_QUALITY, timeout=None, digest=None, force=False,
+                 frame_bytes=None, total_bytes=None):
+        super().__init__(label, ip)
+        self.lcd_array = list(lcd_array)
+        self.frames = list(frames) if frames is not None else None
+        self.loader = loader
+        self.speed = speed
+        self.quality = quality
+        self.timeout = timeout
+        self.digest = digest
+        self.force = force
+        self.pic_id = None
+        self.budget = BudgetEncoder(frame_bytes, total_bytes) if (frame_bytes or total_bytes) else None
+        self._load_lock = threading.Lock()
+        self._encoding = None   # future -> list of per-frame futures
+
+    def content_digest(self):
+        """Hash used by the device-state mirror. Loader jobs should pass ``digest``
+        so unchanged screens are skipped before decoding."""
+        if self.digest is None:
+            self._load()
+            quality = self.budget.describe() if self.budget else self.quality
+            self.digest = frames_digest(self.frames, self.speed, quality)
+        return self.digest
+
+    def _load(self):
+        with self._load_lock:
+            if self.frames is None:
+                self.frames = list(self.loader())
+
+    def start_encoding(self):
+        if self._encoding is not None:
+            return
+        if not self.force and (self.frames is not None or self.digest is not None):
+            if get_mirror().is_showing(self.ip, self.lcd_array, self.content_digest()):
+                return   # will be skipped, don't bother
+        if self.budget and self.budget.total_bytes:
+            return   # frames share one budget, so they're encoded in order
+        self._encoding = get_encode_pool().submit(self._encode_all)
+
+    def _encode_all(self):
+        self._load()
+        pool = get_encode_pool()
+        return [pool.submit(self._encode, i) for i in range(len(self.frames))]
+
+    def _encode(self, index):
+        if self.cancelled:
+            raise JobCancelled()
+        frame = self.frames[index]
+        if self.budget and self.budget.total_bytes:
+            # Depends on what the other frames used, so not cacheable per frame
+            return base64.b64encode(self.budget.encode(self.frames, index)).decode()
+        if self.budget:
+            return get_payload_cache().get(frame, self.budget.describe(), lambda: base64.b64encode(
+                self.budget.encode(self.frames, index)).decode())
+        return get_payload_cache().get(frame, self.quality, lambda: encode_frame(frame, self.quality))
+
+    def prepare(self):
+        if self._encoding is not None:
+            self._encoding.result()
+        self._load()
+        if self.pic_id is None:
+            self.pic_id = next_pic_id()
+
+    def cancel(self):
+        super().cancel()
+        if self._encoding is not None and self._encoding.done() and not self._encoding.exception():
+            for fut in self._encoding.result():
+                fut.cancel()
+
+    def __len__(self):
+        return len(self.frames or [])
+
+    def payload(self, index):
+        if self._encoding is not None:
+            data = self._encoding.result()[index].result()
+        else:
+            data = self._encode(index)
+        return Command.send_http_gif(
+            self.lcd_array, len(self.frames), index, self.pic_id, self.speed, data, IMG_SIZE
+        )
+
+
+class JpegGifJob(GifJob):
+    """GifJob whose frames are already device JPEGs (e.g. from a binary theme),
+    so only base64 is left to do. Pass ``digest``; ``frames``/``loader``
+    provide JPEG bytes instead of images."""
+
+    def _encode(self, index):
+        if self.cancelled:
+            raise JobCancelled()
+        return base64.b64encode(self.frames[index]).decode()
+
+
+def lcd_array_for(screen_index):
+    lcd = [0] * SCREEN_COUNT
+    lcd[screen_index] = 1
+    return lcd
+
+
+def force_requested():
+    """Shift held while clicking Send re-sends even if the screen already shows it."""
+    return bool(QApplication.keyboardModifiers() & Qt.ShiftModifier)
+
+
+class SendQueue(QThread):
+    """Single worker thread that runs queued jobs one at a time, commands first."""
+
+    job_queued    = pyqtSignal(int, str)        # (job_id, label)
+    job_started   = pyqtSignal(int, str, int)   # (job_id, label, total)
+    job_progress  = pyqtSignal(int, int, int)   # (job_id, done, total)
+    job_finished  = pyqtSignal(int)
+    job_failed    = pyqtSignal(int, str)
+    job_cancelled = pyqtSignal(int)
+    job_skipped   = pyqtSignal(int, str)        # (job_id, label) - screen already shows it
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.PriorityQueue()
+        self._jobs = {}
+        self._failed = {}   # job_id -> resumable GifJob
+        self._clean = True
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, job):
+        with self._lock:
+            if job.id is None:
+                job.id = next(self._ids)
+            self._jobs[job.id] = job
+        self.job_queued.emit(job.id, job.label)
+        job.start_encoding()
+        self._queue.put((job.priority, job.id, job))
+        return job.id
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job:
+            job.cancel()
+
+    def cancel_all(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+
+    def can_resume(self, job_id):
+        with self._lock:
+            return job_id in self._failed
+
+    def resume(self, job_id):
+        """Re-queue a failed upload; it continues from its first unacknowledged frame."""
+        with self._lock:
+            job = self._failed.pop(job_id, None)
+        if job is None:
+            return None
+        job._cancel.clear()
+        return self.submit(job)
+
+    def resume_all(self):
+        with self._lock:
+            job_ids = list(self._failed)
+        for job_id in job_ids:
+            self.resume(job_id)
+
+    def pending(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def stop(self):
+        self.cancel_all()
+        self._queue.put((-1, 0, None))
+        self.wait()
+
+    def run(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            try:
+                self._run_job(job)
+            except JobCancelled:
+                self.job_cancelled.emit(job.id)
+            except Exception as e:
+                if isinstance(e, UploadError) and isinstance(job, GifJob):
+                    with self._lock:
+                        self._failed[job.id] = job
+                        while len(self._failed) > MAX_RESUMABLE:
+                            self._failed.pop(next(iter(self._failed)))
+                if not job.silent:
+                    self.job_failed.emit(job.id, str(e))
+            finally:
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+
+    def _run_job(self, job):
+        if job.cancelled:
+            raise JobCancelled()
+        lcd_array = getattr(job, "lcd_array", None)
+        mirror = get_mirror() if lcd_array else None
+        if mirror:
+            digest = job.content_digest()
+            if not job.force and mirror.is_showing(job.ip, lcd_array, digest):
+                self.job_skipped.emit(job.id, job.label)
+                return
+            # Whatever was there is gone once the first frame lands
+            mirror.invalidate_lcds(job.ip, lcd_array)
+        job.prepare()
+        total = len(job)
+        if not job.silent:
+            self.job_started.emit(job.id, job.label, total)
+            if job.acked:
+                self.job_progress.emit(job.id, len(job.acked), total)
+        client = get_client(job.ip)
+        if client is None:
+            raise RuntimeError("No device IP set.")
+        pacer = get_pacer(job.ip) if job.paced else None
+        self._clean = True
+        try:
+            for index in range(job.resume_offset(), total):
+                if index in job.acked:
+                    continue
+                if job.cancelled:
+                    raise JobCancelled()
+                self._post_with_retry(client, job, job.payload(index), pacer)
+                job.acked.add(index)
+                if not job.silent:
+                    self.job_progress.emit(job.id, len(job.acked), total)
+        finally:
+            if pacer:
+                pacer.job_done(self._clean)
+        if mirror:
+            mirror.update(job.ip, lcd_array, digest)
+        self.job_finished.emit(job.id)
+
+    def _post_with_retry(self, client, job, payload, pacer):
+        attempt = 0
+        while True:
+            if pacer and attempt == 0:
+                pacer.wait()   # retries are spaced by the backoff instead
+            started = time.monotonic()
+            try:
+                resp = client.post(payload, timeout=job.timeout)
+                ok = resp.ok
+                transient = resp.status_code >= 500
+                error = f"Device responded with HTTP {resp.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                ok, transient, error = False, True, str(e)
+            if pacer:
+                pacer.record(time.monotonic() - started, ok)
+            if ok:
+                return resp
+            self._clean = False
+            if not transient or attempt >= job.retries:
+                if "PicOffset" in payload:
+                    error += f" (frame {payload['PicOffset'] + 1} of {len(job)})"
+                raise UploadError(error, job)
+            # Exponential backoff with a little jitter; wakes early on cancel
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)) * random.uniform(0.8, 1.2)
+            if job._cancel.wait(delay):
+                raise JobCancelled()
+            attempt += 1
+
+
+def send_command(ip, payload, label="", timeout=None, silent=True):
+    """Queue a fire-and-forget command; it runs between uploads, never mid-upload."""
+    if not ip or not ip.strip():
+        return None
+    job = CommandJob(label or payload["Command"], ip.strip(), [payload], timeout, silent)
+    return get_send_queue().submit(job)
+
+
+_send_queue = None
+
+
+def get_send_queue():
+    """Return the app-wide send queue, starting its worker on first use."""
+    global _send_queue
+    if _send_queue is None:
+        _send_queue = SendQueue()
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_send_queue.stop)
+        _send_queue.start()
+    return _send_queue